@@ -0,0 +1,332 @@
+"""
+Параллельный запуск тестов обоих проектов.
+
+Проекты тестируются одновременно, и тесты каждого делятся на --workers
+частей (по умолчанию по числу ядер). Каждая часть идёт в своём
+процессе pytest со своей БД SQLite. БД не создаётся из миграций: часть
+получает копию шаблонной БД, к которой миграции уже применены. Шаблон
+хранится в <проект>/.test_db/ и создаётся заново, только когда
+меняются файлы миграций или версия Django: их хэш входит в имя файла.
+
+Тесты распределяются по частям по длительностям из прошлого запуска,
+чтобы все процессы заканчивали примерно одновременно. Тесты одного
+класса TestCase попадают в одну часть: setUpTestData выполняется
+один раз на класс.
+
+    python parallel_tests.py [--workers N] [-- аргументы pytest]
+
+--serial запускает проекты по очереди одним процессом pytest с БД из
+миграций, как run_tests.sh. --copies N размножает тесты для замеров:
+каждый проект тестируется N копиями своих тестов.
+"""
+import argparse
+import contextlib
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import django
+
+BASE_DIR = Path(__file__).resolve().parent
+# Проект: модуль настроек и каталог тестов.
+PROJECTS = {
+    'ya_news': ('yanews.settings', 'news/pytest_tests'),
+    'ya_note': ('yanote.settings', 'notes/tests'),
+}
+CACHE_DIR = '.test_db'
+DURATIONS_FILE = 'durations.json'
+# Код выхода pytest, когда тестов не нашлось.
+NO_TESTS_COLLECTED = 5
+# Длительность теста, который ещё ни разу не запускался, в секундах.
+UNKNOWN_DURATION = 0.05
+# addopts из pytest.ini включают подробный вывод, а его части пишут
+# в свои файлы; кэш pytest отключён, как в pytest.ini.
+PYTEST = (sys.executable, '-m', 'pytest', '-o', 'addopts=',
+          '-p', 'no:cacheprovider')
+CREATE_TEMPLATE = (
+    'import django; django.setup(); '
+    'from django.db import connection; '
+    'connection.creation.create_test_db(verbosity=0, keepdb=True)'
+)
+
+# Длительности тестов процесса pytest, в который модуль подключён
+# через -p parallel_tests.
+DURATIONS = defaultdict(float)
+
+
+def pytest_runtest_logreport(report):
+    DURATIONS[report.nodeid] += report.duration
+
+
+def pytest_collection_finish(session):
+    path = os.environ.get('COLLECTED_TESTS')
+    if path:
+        Path(path).write_text(json.dumps(
+            [item.nodeid for item in session.items]
+        ), encoding='utf-8')
+
+
+def pytest_sessionfinish(session):
+    path = os.environ.get('TEST_DURATIONS')
+    if path:
+        Path(path).write_text(json.dumps(DURATIONS), encoding='utf-8')
+
+
+def project_env(settings_module, **variables):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (str(BASE_DIR), env.get('PYTHONPATH')))
+    )
+    env.update(variables)
+    return env
+
+
+def migrations_hash(project_dir):
+    digest = hashlib.sha256(django.__version__.encode())
+    for path in sorted(project_dir.glob('*/migrations/*.py')):
+        digest.update(path.relative_to(project_dir).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def template_db(project_dir, settings_module):
+    """Шаблонная БД проекта; создаётся, если миграции изменились."""
+    cache = project_dir / CACHE_DIR
+    template = cache / f'template-{migrations_hash(project_dir)}.sqlite3'
+    if template.exists():
+        return template
+    cache.mkdir(exist_ok=True)
+    for old in cache.glob('template-*'):
+        old.unlink()
+    # Готовый шаблон появляется под своим именем только целиком.
+    partial = cache / f'{template.name}.partial'
+    subprocess.run(
+        (sys.executable, '-c', CREATE_TEMPLATE), cwd=project_dir,
+        env=project_env(settings_module, TEST_DB_NAME=str(partial)),
+        check=True,
+    )
+    partial.replace(template)
+    return template
+
+
+def collect(project_dir, settings_module, paths, pytest_args, output):
+    """
+    id тестов, которые pytest выполнил бы с этими аргументами.
+
+    id записывает в файл output хук pytest_collection_finish, а не
+    разбор вывода: с -q из аргументов pytest вывел бы только число
+    тестов в файлах. Ноль тестов без отбора через -k или -m — ошибка:
+    скорее всего, тесты просто не нашлись.
+    """
+    result = subprocess.run(
+        (*PYTEST, '-p', 'parallel_tests', '--collect-only', *paths,
+         *pytest_args),
+        cwd=project_dir,
+        env=project_env(settings_module, COLLECTED_TESTS=str(output)),
+        capture_output=True, text=True,
+    )
+    if result.returncode not in (0, NO_TESTS_COLLECTED):
+        sys.exit(result.stdout + result.stderr)
+    node_ids = json.loads(output.read_text(encoding='utf-8'))
+    if not node_ids and not any(
+        arg.startswith(('-k', '-m')) for arg in pytest_args
+    ):
+        sys.exit(f'{project_dir.name}: не найдено ни одного теста.')
+    return node_ids
+
+
+def group_key(node_id):
+    parts = node_id.split('::')
+    return '::'.join(parts[:2]) if len(parts) > 2 else node_id
+
+
+def make_shards(node_ids, durations, count):
+    """
+    Делит тесты на count частей с близкой суммарной длительностью.
+
+    Группы тестов раздаются от самой долгой, каждая — в часть с
+    наименьшей суммой на этот момент.
+    """
+    groups = defaultdict(list)
+    for node_id in node_ids:
+        groups[group_key(node_id)].append(node_id)
+    costs = sorted((
+        (sum(durations.get(node_id, UNKNOWN_DURATION) for node_id in tests),
+         tests)
+        for tests in groups.values()
+    ), key=lambda item: -item[0])
+    shards = [(0.0, index, []) for index in range(count)]
+    for cost, tests in costs:
+        total, index, shard = heapq.heappop(shards)
+        shard.extend(tests)
+        heapq.heappush(shards, (total + cost, index, shard))
+    return [shard for _, _, shard in sorted(shards, key=lambda item: item[1])
+            if shard]
+
+
+@contextlib.contextmanager
+def test_copies(project_dir, tests_path, copies):
+    """Пути к тестам проекта и copies - 1 их временным копиям."""
+    made = []
+    try:
+        for number in range(1, copies):
+            copy = project_dir / f'tests_copy_{number}'
+            shutil.copytree(
+                project_dir / tests_path, copy,
+                ignore=shutil.ignore_patterns('__pycache__'),
+            )
+            made.append(copy)
+        yield [tests_path] + [copy.name for copy in made]
+    finally:
+        for copy in made:
+            shutil.rmtree(copy, ignore_errors=True)
+
+
+class Shard:
+    """Процесс pytest с частью тестов одного проекта."""
+
+    def __init__(self, project, number, directory):
+        self.project = project
+        self.name = f'{project} #{number}'
+        self.output = directory / f'{project}-{number}.log'
+        self.durations = directory / f'{project}-{number}.json'
+        self.process = None
+
+    def start(self, args, env):
+        with open(self.output, 'w', encoding='utf-8') as output:
+            self.process = subprocess.Popen(
+                (*PYTEST, *args), cwd=BASE_DIR / self.project, env=env,
+                stdout=output, stderr=subprocess.STDOUT,
+            )
+
+    def report(self):
+        """Итоговая строка pytest, а при ошибках — весь вывод."""
+        text = self.output.read_text(encoding='utf-8')
+        if self.process.returncode:
+            return text
+        lines = text.strip().splitlines()
+        return lines[-1] if lines else ''
+
+
+def start_parallel(project, paths, args, directory):
+    """Запускает части тестов project, каждую на копии шаблонной БД."""
+    project_dir = BASE_DIR / project
+    settings_module = PROJECTS[project][0]
+    template = template_db(project_dir, settings_module)
+    durations_path = project_dir / CACHE_DIR / DURATIONS_FILE
+    durations = (
+        json.loads(durations_path.read_text(encoding='utf-8'))
+        if durations_path.exists() else {}
+    )
+    node_ids = collect(
+        project_dir, settings_module, paths, args.pytest_args,
+        directory / f'{project}-tests.json',
+    )
+    shards = []
+    for number, tests in enumerate(
+        make_shards(node_ids, durations, args.workers), start=1
+    ):
+        shard = Shard(project, number, directory)
+        database = directory / f'{project}-{number}.sqlite3'
+        shutil.copyfile(template, database)
+        shard.start(
+            ('-p', 'parallel_tests', '--reuse-db', *args.pytest_args,
+             *tests),
+            project_env(
+                settings_module, TEST_DB_NAME=str(database),
+                TEST_DURATIONS=str(shard.durations),
+            ),
+        )
+        shards.append(shard)
+    return shards
+
+
+def save_durations(project, shards):
+    path = BASE_DIR / project / CACHE_DIR / DURATIONS_FILE
+    durations = (
+        json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+    )
+    for shard in shards:
+        if shard.durations.exists():
+            durations.update(json.loads(
+                shard.durations.read_text(encoding='utf-8')
+            ))
+    path.write_text(json.dumps(durations, indent=0), encoding='utf-8')
+
+
+def run(args, directory):
+    """Прогоняет тесты обоих проектов; возвращает завершившиеся части."""
+    with contextlib.ExitStack() as stack:
+        paths = {
+            project: stack.enter_context(test_copies(
+                BASE_DIR / project, tests_path, args.copies
+            ))
+            for project, (_, tests_path) in PROJECTS.items()
+        }
+        shards = []
+        for project in PROJECTS:
+            if args.serial:
+                shard = Shard(project, 1, directory)
+                shard.start(
+                    (*args.pytest_args, *paths[project]),
+                    project_env(PROJECTS[project][0]),
+                )
+                shard.process.wait()
+                shards.append(shard)
+            else:
+                shards += start_parallel(
+                    project, paths[project], args, directory
+                )
+        for shard in shards:
+            shard.process.wait()
+    if not args.serial:
+        for project in PROJECTS:
+            save_durations(
+                project,
+                [shard for shard in shards if shard.project == project],
+            )
+    return shards
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='На сколько процессов делить тесты каждого проекта.'
+    )
+    parser.add_argument(
+        '--serial', action='store_true',
+        help='Проекты по очереди, без разделения и шаблонной БД.'
+    )
+    parser.add_argument(
+        '--copies', type=int, default=1,
+        help='Сколько копий тестов каждого проекта запускать.'
+    )
+    parser.add_argument('pytest_args', nargs='*')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        shards = run(args, Path(directory))
+        for shard in shards:
+            print(f'{shard.name}: {shard.report()}')
+    print(f'Всего {time.perf_counter() - start:.1f} с')
+    sys.exit(max(
+        (shard.process.returncode for shard in shards),
+        default=NO_TESTS_COLLECTED,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,11 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        # --parallel: оба проекта сразу, тесты делятся между ядрами
+        # (см. parallel_tests.py); остальные аргументы — для pytest.
+        if [[ "$1" == "--parallel" ]]; then
+            exec python parallel_tests.py -- --tb=line "${@:2}" 1>&2
+        fi
         cd ya_news
         export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
         if pytest --tb=line 1>&2;
@@ -0,0 +1,79 @@
+"""
+Бенчмарки проекта YaNews.
+
+Запускаются из каталога ya_news, например::
+
+    python -m benchmarks.bad_words
+"""
+import contextlib
+import os
+import time
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """Отдельная БД из миграций, как в тестах; удаляется после замера."""
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def fresh_database(directory, name):
+    """
+    Новая БД в файле: БД в памяти переживает test_database() в этом
+    же процессе, а каждому этапу нужна чистая.
+    """
+    from django.db import connection
+
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, f'{name}.sqlite3'
+    )
+    with test_database():
+        yield
+
+
+def seed_database(news, comments_per_news=20, users=100):
+    """
+    Стандартные данные для замеров: news.seed.generate.
+
+    Популярность новостей и активность авторов распределены по закону
+    Ципфа, comments_per_news — среднее число комментариев на новость.
+    Возвращает id новостей от самой свежей.
+    """
+    from news.models import News
+    from news.seed import generate
+
+    generate(news=news, users=users, comments=news * comments_per_news)
+    return list(News.objects.values_list('pk', flat=True))
+
+
+def measure(func, repeat):
+    """Время каждого из repeat вызовов func в секундах."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index]
@@ -0,0 +1,157 @@
+"""
+Синхронные и асинхронные представления под ASGI-сервером uvicorn.
+
+Анонимные клиенты одновременно открывают главную и страницы новостей.
+Сервер запускается дважды, в отдельных процессах: с синхронными
+представлениями (по умолчанию) и с NEWS_ASYNC_VIEWS=1. Нужен uvicorn::
+
+    pip install uvicorn
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import percentile, seed_database, setup_django, test_database
+
+MODES = {'sync': '0', 'async': '1'}
+
+
+def start_uvicorn():
+    import uvicorn
+    from django.core.asgi import get_asgi_application
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(
+        get_asgi_application(), host='127.0.0.1', port=port,
+        lifespan='off', log_level='warning',
+    ))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, port
+
+
+def fetch(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        response.read()
+    finally:
+        connection.close()
+    return response.status
+
+
+def run_clients(port, paths, args):
+    deadline = time.perf_counter() + args.duration
+    results = []
+
+    def work(number):
+        rng = random.Random(number)
+        timings, errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            errors += fetch(port, rng.choice(paths)) != 200
+            timings.append(time.perf_counter() - start)
+        results.append((timings, errors))
+
+    threads = [
+        threading.Thread(target=work, args=(number,))
+        for number in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    timings = [timing for part, _ in results for timing in part]
+    return {
+        'requests': len(timings),
+        'rps': len(timings) / elapsed,
+        'p50': percentile(timings, 50),
+        'p99': percentile(timings, 99),
+        'errors': sum(errors for _, errors in results),
+    }
+
+
+def worker(args):
+    """
+    Сервер с текущим набором представлений.
+
+    Печатает порт и адреса страниц, работает, пока не закроют stdin.
+    Клиенты запускаются в родительском процессе, чтобы не делить с
+    сервером GIL.
+    """
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+
+    # Потоки сервера открывают свои соединения, поэтому БД в файле.
+    directory = tempfile.TemporaryDirectory()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory.name, 'asgi.sqlite3'
+    )
+    with directory, test_database():
+        news_ids = seed_database(args.news, args.comments)
+        connection.close()
+        paths = [reverse('news:home')] + [
+            reverse('news:detail', args=(pk,)) for pk in news_ids
+        ]
+        server, thread, port = start_uvicorn()
+        print(json.dumps({'port': port, 'paths': paths}), flush=True)
+        sys.stdin.read()
+        server.should_exit = True
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Комментариев на новость в среднем.')
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+    try:
+        import uvicorn  # noqa: F401
+    except ImportError:
+        parser.error('нужен uvicorn: pip install uvicorn')
+    print(f'Клиентов: {args.clients}, {args.duration:.0f} с')
+    for mode, flag in MODES.items():
+        # Набор представлений выбирается при импорте news.urls, поэтому
+        # каждый режим запускается в отдельном процессе.
+        server = subprocess.Popen(
+            [sys.executable, '-m', __spec__.name, '--worker', *sys.argv[1:]],
+            env={**os.environ, 'NEWS_ASYNC_VIEWS': flag},
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            started = json.loads(server.stdout.readline())
+            result = run_clients(started['port'], started['paths'], args)
+        finally:
+            server.stdin.close()
+            server.wait()
+        print(f'{mode:>6}: {result["rps"]:7.0f} запросов/с, '
+              f'p50 {result["p50"] * 1000:6.1f} мс, '
+              f'p99 {result["p99"] * 1000:6.1f} мс, '
+              f'ошибок {result["errors"]} из {result["requests"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Сравнение старой проверки запрещённых слов с компилированным выражением.
+
+Списки из 10, 1 000 и 50 000 слов проверяются на комментариях по 10 КБ.
+"""
+import argparse
+import random
+
+from news.moderation import BadWordMatcher
+
+from . import measure, percentile
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+ENDINGS = ('а', 'у', 'ой', 'ами', 'ах', 'ею', 'ям', 'ого', 'ему')
+SIZES = (10, 1_000, 50_000)
+TEXT_SIZE = 10 * 1024
+
+
+def make_words(count, rng):
+    """Основы длиной 5–10 букв с несколькими окончаниями, как у словоформ."""
+    words = set()
+    while len(words) < count:
+        stem = ''.join(rng.choices(ALPHABET, k=rng.randint(5, 10)))
+        for ending in rng.sample(ENDINGS, 3):
+            words.add(stem + ending)
+    return list(words)[:count]
+
+
+def make_text(rng):
+    chunks = []
+    size = 0
+    while size < TEXT_SIZE:
+        word = ''.join(rng.choices(ALPHABET, k=rng.randint(2, 9)))
+        chunks.append(word)
+        size += len(word) + 1
+    return ' '.join(chunks)[:TEXT_SIZE]
+
+
+def substring_scan(words, text):
+    """Прежний алгоритм CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    texts = [make_text(rng) for _ in range(args.repeat)]
+    print(f'{"слов":>8} {"подстроки, мс":>15} {"выражение, мс":>15} '
+          f'{"сборка, мс":>12}')
+    for size in SIZES:
+        words = make_words(size, rng)
+        build = measure(lambda: BadWordMatcher(words), 1)[0]
+        matcher = BadWordMatcher(words)
+        texts_iter = iter(texts * 2)
+        scan = measure(
+            lambda: substring_scan(words, next(texts_iter)), args.repeat
+        )
+        compiled = measure(
+            lambda: matcher.search(next(texts_iter)), args.repeat
+        )
+        print(f'{size:>8} {percentile(scan, 50) * 1000:>15.3f} '
+              f'{percentile(compiled, 50) * 1000:>15.3f} '
+              f'{build * 1000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
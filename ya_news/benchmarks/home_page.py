@@ -0,0 +1,132 @@
+"""
+Пропускная способность главной страницы для анонимов.
+
+Анонимные клиенты запрашивают главную через HTTP-сервер, пока фоновый
+поток изредка добавляет комментарии. Три режима:
+
+* render — без кэша и без условных запросов, страница отрисовывается
+  каждый раз;
+* conditional — клиенты присылают If-None-Match и получают 304, пока
+  лента не изменилась;
+* page-cache — включён кэш страницы для анонимов
+  (NEWS_HOME_PAGE_CACHE_TIMEOUT), клиенты без условных запросов.
+"""
+import argparse
+import http.client
+import os
+import tempfile
+import threading
+import time
+
+from . import percentile, seed_database, setup_django, test_database
+from .sqlite_load import make_server
+
+MODES = ('render', 'conditional', 'page-cache')
+
+
+def get_home(port, etag):
+    headers = {} if etag is None else {'If-None-Match': etag}
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        connection.request('GET', '/', headers=headers)
+        response = connection.getresponse()
+        response.read()
+    finally:
+        connection.close()
+    return response.status, response.getheader('ETag')
+
+
+def run_clients(port, mode, args):
+    deadline = time.perf_counter() + args.duration
+    results = []
+
+    def work():
+        timings, not_modified, etag = [], 0, None
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, new_etag = get_home(port, etag)
+            timings.append(time.perf_counter() - start)
+            not_modified += status == 304
+            if mode == 'conditional':
+                etag = new_etag
+        results.append((timings, not_modified))
+
+    threads = [threading.Thread(target=work) for _ in range(args.clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    timings = [timing for part, _ in results for timing in part]
+    return {
+        'rps': len(timings) / elapsed,
+        'p50': percentile(timings, 50),
+        'p99': percentile(timings, 99),
+        'not_modified': sum(count for _, count in results) / len(timings),
+    }
+
+
+def write_comments(news_ids, author, interval, stop):
+    """Фоновые комментарии: лента меняется, как на живом сайте."""
+    from django.db import connection
+
+    from news.models import Comment
+
+    number = 0
+    while not stop.wait(interval):
+        Comment.objects.create(
+            news_id=news_ids[number % len(news_ids)], author=author,
+            text=f'Комментарий {number}',
+        )
+        number += 1
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--writes-per-second', type=float, default=2)
+    parser.add_argument('--news', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import override_settings
+
+    directory = tempfile.TemporaryDirectory()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory.name, 'home.sqlite3'
+    )
+    with directory, test_database():
+        news_ids = seed_database(args.news)
+        author = get_user_model().objects.create(username='Автор')
+        connection.close()
+        server = make_server(args.workers)
+        print(f'Клиентов: {args.clients}, потоков сервера: {args.workers}, '
+              f'комментариев в секунду: {args.writes_per_second}')
+        try:
+            for mode in MODES:
+                timeout = 60 if mode == 'page-cache' else None
+                stop = threading.Event()
+                writer = threading.Thread(target=write_comments, args=(
+                    news_ids, author, 1 / args.writes_per_second, stop
+                ))
+                writer.start()
+                with override_settings(NEWS_HOME_PAGE_CACHE_TIMEOUT=timeout):
+                    result = run_clients(server.server_address[1], mode, args)
+                stop.set()
+                writer.join()
+                print(f'{mode:>12}: {result["rps"]:7.0f} запросов/с, '
+                      f'p50 {result["p50"] * 1000:6.1f} мс, '
+                      f'p99 {result["p99"] * 1000:6.1f} мс, '
+                      f'304: {result["not_modified"]:.0%}')
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Размер ответа и задержка JSON API в сравнении с HTML-страницами.
+
+Для каждой пары выводятся размер ответа и p50/p99 времени ответа.
+Кэш очищается перед каждым запросом: сравнивается работа, а не
+попадание во фрагментный кэш страницы новости.
+"""
+import argparse
+
+from . import (measure, percentile, seed_database, setup_django,
+               test_database)
+
+
+def create_data(args):
+    """Стандартный набор данных; замеряем самую обсуждаемую новость."""
+    from news.models import News
+
+    seed_database(args.news, args.comments)
+    return News.objects.order_by('-comment_count').first()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=2_000)
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Комментариев на новость в среднем.')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    with test_database():
+        news = create_data(args)
+        detail = reverse('news:detail', args=(news.pk,))
+        api_detail = reverse('news:api-news-detail', args=(news.pk,))
+        api_comments = reverse('news:api-comments', args=(news.pk,))
+        cases = (
+            ('HTML главная', [(reverse('news:home'), {})]),
+            ('API 10 новостей', [(reverse('news:api-news-list'), {
+                'limit': 10,
+            })]),
+            ('HTML новость', [(detail, {})]),
+            ('API новость+комментарии', [
+                (api_detail, {}), (api_comments, {}),
+            ]),
+            ('API 500 новостей, id,title', [(reverse('news:api-news-list'), {
+                'limit': 500, 'fields': 'id,title',
+            })]),
+        )
+        client = Client()
+        for name, requests in cases:
+            sizes = []
+
+            def fetch():
+                cache.clear()
+                sizes.clear()
+                for url, params in requests:
+                    response = client.get(url, params)
+                    content = (
+                        b''.join(response.streaming_content)
+                        if response.streaming else response.content
+                    )
+                    sizes.append(len(content))
+
+            timings = measure(fetch, args.repeat)
+            print(f'{name:>28}: {sum(sizes) / 1024:7.1f} КиБ, '
+                  f'p50 {percentile(timings, 50) * 1000:5.1f} мс, '
+                  f'p99 {percentile(timings, 99) * 1000:5.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Поиск по новостям на синтетическом корпусе.
+
+Загружает --articles новостей со словами из словаря с частотами по
+закону Ципфа и замеряет p50/p99 времени получения первой страницы
+результатов вместе с подсчётом общего числа найденных.
+"""
+import argparse
+import itertools
+import random
+from datetime import date, timedelta
+
+from . import measure, percentile, setup_django, test_database
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+VOCABULARY_SIZE = 50_000
+
+
+def make_vocabulary(rng):
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def create_news(count, words, rng):
+    from news.models import News
+
+    weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, len(words) + 1)
+    ))
+    today = date.today()
+    batch = []
+    for number in range(count):
+        batch.append(News(
+            title=' '.join(rng.choices(words, cum_weights=weights, k=5))[:50],
+            text=' '.join(rng.choices(
+                words, cum_weights=weights, k=rng.randint(50, 200)
+            )),
+            date=today - timedelta(days=number % 3650),
+        ))
+        if len(batch) == 10_000:
+            News.objects.bulk_create(batch)
+            batch = []
+    News.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=500_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=10)
+    args = parser.parse_args()
+    setup_django()
+    from news.search import search_news
+
+    rng = random.Random(0)
+    words = make_vocabulary(rng)
+    with test_database():
+        create_news(args.articles, words, rng)
+        queries = iter([
+            ' '.join(rng.sample(words[:5000], rng.randint(1, 2)))
+            for _ in range(args.queries)
+        ])
+
+        def first_page():
+            results = search_news(next(queries))
+            results.count()
+            list(results[:args.page_size])
+
+        timings = measure(first_page, args.queries)
+        print(f'Новостей: {args.articles}, запросов: {args.queries}')
+        print(f'p50 {percentile(timings, 50) * 1000:.1f} мс, '
+              f'p99 {percentile(timings, 99) * 1000:.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Отрисовка шаблона главной страницы с кэшем шаблонов и без него.
+
+Шаблон news/home.html отрисовывается --renders раз с настройками
+шаблонов по умолчанию и с профилем TEMPLATES_PROFILE=production, каждый
+раз в отдельном процессе. Выводятся время прогрева, первой отрисовки
+и среднее время одной отрисовки.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import date
+
+from . import setup_django
+
+PROFILES = ('default', 'production')
+TEMPLATE = 'news/home.html'
+
+
+def make_context():
+    from django.conf import settings
+
+    from news.models import News
+
+    return {'object_list': [
+        News(
+            pk=number, title=f'Новость {number}', text='Текст. ' * 100,
+            date=date.today(), comment_count=number,
+        )
+        for number in range(1, settings.NEWS_COUNT_ON_HOME_PAGE + 1)
+    ]}
+
+
+def worker(args):
+    """Один замер в текущем процессе и с текущим профилем."""
+    setup_django()
+    from django.contrib.auth.models import AnonymousUser
+    from django.template.loader import render_to_string
+    from django.test import RequestFactory
+
+    from yacommon.warmup import warm_templates
+
+    started = time.perf_counter()
+    warmed = warm_templates()
+    warm_up = time.perf_counter() - started
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    context = make_context()
+    started = time.perf_counter()
+    render_to_string(TEMPLATE, context, request)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(args.renders):
+        render_to_string(TEMPLATE, context, request)
+    total = time.perf_counter() - started
+    print(json.dumps({
+        'warmed': warmed, 'warm_up': warm_up, 'first': first,
+        'total': total, 'mean': total / args.renders,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--renders', type=int, default=10_000)
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+    print(f'Шаблон {TEMPLATE}, отрисовок: {args.renders}')
+    for profile in PROFILES:
+        # Настройки шаблонов читаются при импорте, поэтому каждый профиль
+        # замеряется в отдельном процессе.
+        output = subprocess.run(
+            [sys.executable, '-m', __spec__.name, '--worker', *sys.argv[1:]],
+            env={**os.environ, 'TEMPLATES_PROFILE': profile},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{profile:>10}: прогрев {result["warmed"]} шаблонов '
+              f'{result["warm_up"] * 1000:.1f} мс, '
+              f'первая отрисовка {result["first"] * 1000:.1f} мс, '
+              f'в среднем {result["mean"] * 1_000_000:.0f} мкс, '
+              f'всего {result["total"]:.1f} с')
+
+
+if __name__ == '__main__':
+    main()
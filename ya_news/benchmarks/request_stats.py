@@ -0,0 +1,83 @@
+"""
+Накладные расходы RequestStatsMiddleware (yacommon.request_stats).
+
+Одни и те же страницы запрашиваются тестовым клиентом без статистики
+и со статистикой; режимы чередуются по раундам, чтобы фоновый шум
+поровну доставался обоим. Сравниваются медианы времени запроса.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from . import seed_database, setup_django, test_database
+
+
+def make_client(enabled):
+    """Клиент, у которого middleware загружены при REQUEST_STATS=enabled."""
+    from django.test import Client, override_settings
+
+    client = Client()
+    with override_settings(REQUEST_STATS=enabled):
+        client.get('/')
+    return client
+
+
+def time_requests(client, urls, repeat):
+    timings = []
+    for _ in range(repeat):
+        for url in urls:
+            start = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+
+    from yacommon.request_stats import STATS
+
+    directory = tempfile.TemporaryDirectory()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory.name, 'stats.sqlite3'
+    )
+    with directory, test_database():
+        news_id = seed_database(args.news)[0]
+        urls = [
+            reverse('news:home'),
+            reverse('news:detail', args=(news_id,)),
+            reverse('news:comments', args=(news_id,)) + '?page=2',
+            reverse('news:search') + '?q=а',
+            reverse('news:api-news-list'),
+            reverse('news:api-comments', args=(news_id,)),
+        ]
+        clients = {False: make_client(False), True: make_client(True)}
+        timings = {False: [], True: []}
+        for _ in range(args.rounds):
+            for enabled, client in clients.items():
+                timings[enabled] += time_requests(client, urls, args.repeat)
+        off, on = (statistics.median(timings[mode]) for mode in (False, True))
+        print(f'Запросов в каждом режиме: {len(timings[False])}')
+        print(f'без статистики: медиана {off * 1000:.3f} мс')
+        print(f'со статистикой: медиана {on * 1000:.3f} мс')
+        print(f'накладные расходы: {(on - off) / off:+.2%}')
+        for view_name, stats in STATS.as_dict().items():
+            print(f'{view_name:>20}: запросов к БД p50 '
+                  f'{stats["queries"]["p50"]:3.0f}, БД p50 '
+                  f'{stats["db_ms"]["p50"]:6.3f} мс, всего p50 '
+                  f'{stats["time_ms"]["p50"]:6.3f} мс')
+
+
+if __name__ == '__main__':
+    main()
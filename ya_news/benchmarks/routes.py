@@ -0,0 +1,391 @@
+"""
+Замеры всех именованных маршрутов с порогами регрессий.
+
+Для каждого размера из --sizes создаётся новая БД с таким числом
+новостей (seed_database), и каждый сценарий из SCENARIOS выполняется
+тестовым клиентом: число SQL-запросов, пик памяти по tracemalloc и
+время — лучшая из --rounds медиан по --repeat запросов. Маршрут без
+сценария — ошибка: новый маршрут должен попасть в замеры.
+
+Результаты сравниваются с базовыми из --baseline. Если маршрут стал
+медленнее больше чем на --threshold, требует памяти больше чем на
+--memory-threshold или выполняет больше запросов, чем на
+--query-threshold, процесс завершается с кодом 1. --save записывает
+результаты как новый базовый уровень.
+
+Время зависит от машины: базовый уровень стоит записать там же, где
+идёт сравнение, а на шумных машинах поднять --threshold. Запросы
+и память от машины не зависят.
+"""
+import argparse
+import gc
+import itertools
+import json
+import math
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+
+from . import fresh_database, seed_database, setup_django
+
+BASELINE = Path(__file__).with_name('routes_baseline.json')
+SIZES = (10, 100, 1000)
+# Не замеряются: админка и сама статистика запросов.
+EXCLUDED = ('admin', 'stats')
+# Разница меньше этой — шум, а не регрессия, при любом пороге.
+NOISE = {'queries': 0, 'time_ms': 0.5, 'peak_kib': 64}
+PASSWORD = 'пароль-для-замеров'
+
+SCENARIOS = {}
+
+
+def scenario(route, variant=''):
+    """
+    Регистрирует сценарий для маршрута route.
+
+    Функция сценария получает Dataset и возвращает запрос — тройку
+    (метод клиента, url, именованные аргументы). Она вызывается перед
+    каждым повтором и в замер не входит: в ней можно создать объект,
+    который запрос удалит.
+    """
+    def register(func):
+        SCENARIOS[f'{route} {variant}'.strip()] = (route, func)
+        return func
+    return register
+
+
+def get(client, route, *args, **params):
+    from django.urls import reverse
+
+    return client.get, reverse(route, args=args), {'data': params}
+
+
+def post(client, route, *args, **data):
+    from django.urls import reverse
+
+    return client.post, reverse(route, args=args), {'data': data}
+
+
+class Dataset:
+    """БД с size новостями, автор комментария и клиенты."""
+
+    def __init__(self, size):
+        from django.contrib.auth import get_user_model
+        from django.test import Client
+
+        from news.models import Comment, News
+
+        seed_database(size)
+        self.news = News.objects.order_by('-comment_count', 'pk').first()
+        self.word = self.news.title.split()[0]
+        self.author = get_user_model().objects.create_user(
+            username='Автор', password=PASSWORD
+        )
+        self.comment = Comment.objects.create(
+            news=self.news, author=self.author, text='Комментарий'
+        )
+        self.anonymous = Client()
+        self.author_client = self.client_for(self.author)
+        self.numbers = itertools.count()
+
+    @staticmethod
+    def client_for(user):
+        from django.test import Client
+
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def new_comment(self):
+        from news.models import Comment
+
+        return Comment.objects.create(
+            news=self.news, author=self.author,
+            text=f'Комментарий {next(self.numbers)}',
+        )
+
+
+@scenario('news:home')
+def home(data):
+    return get(data.anonymous, 'news:home')
+
+
+@scenario('news:search')
+def search(data):
+    return get(data.anonymous, 'news:search', q=data.word)
+
+
+@scenario('news:detail')
+def detail(data):
+    return get(data.anonymous, 'news:detail', data.news.pk)
+
+
+@scenario('news:detail', 'author')
+def detail_for_author(data):
+    return get(data.author_client, 'news:detail', data.news.pk)
+
+
+@scenario('news:detail', 'POST')
+def detail_comment(data):
+    return post(
+        data.author_client, 'news:detail', data.news.pk,
+        text=f'Новый комментарий {next(data.numbers)}',
+    )
+
+
+@scenario('news:comments')
+def comments(data):
+    return get(data.anonymous, 'news:comments', data.news.pk, page=2)
+
+
+@scenario('news:edit')
+def edit(data):
+    return get(data.author_client, 'news:edit', data.comment.pk)
+
+
+@scenario('news:edit', 'POST')
+def edit_comment(data):
+    return post(
+        data.author_client, 'news:edit', data.comment.pk,
+        text=f'Исправленный комментарий {next(data.numbers)}',
+    )
+
+
+@scenario('news:delete')
+def delete(data):
+    return get(data.author_client, 'news:delete', data.comment.pk)
+
+
+@scenario('news:delete', 'POST')
+def delete_comment(data):
+    return post(data.author_client, 'news:delete', data.new_comment().pk)
+
+
+@scenario('news:api-news-list')
+def api_news_list(data):
+    return get(data.anonymous, 'news:api-news-list')
+
+
+@scenario('news:api-news-detail')
+def api_news_detail(data):
+    return get(data.anonymous, 'news:api-news-detail', data.news.pk)
+
+
+@scenario('news:api-comments')
+def api_comments(data):
+    return get(data.anonymous, 'news:api-comments', data.news.pk)
+
+
+@scenario('users:login')
+def login(data):
+    return get(data.anonymous, 'users:login')
+
+
+@scenario('users:login', 'POST')
+def login_with_password(data):
+    from django.test import Client
+
+    return post(
+        Client(), 'users:login',
+        username=data.author.username, password=PASSWORD,
+    )
+
+
+@scenario('users:logout')
+def logout(data):
+    return get(data.client_for(data.author), 'users:logout')
+
+
+@scenario('users:signup')
+def signup(data):
+    return get(data.anonymous, 'users:signup')
+
+
+def route_names(patterns, prefix=''):
+    """Имена всех маршрутов с пространствами имён, как для reverse."""
+    from django.urls import URLResolver
+
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            namespace = f'{pattern.namespace}:' if pattern.namespace else ''
+            yield from route_names(pattern.url_patterns, prefix + namespace)
+        elif pattern.name:
+            yield prefix + pattern.name
+
+
+def missing_routes():
+    from django.urls import get_resolver
+
+    covered = {route for route, _ in SCENARIOS.values()}
+    return sorted(
+        name for name in set(route_names(get_resolver().url_patterns))
+        if name.split(':')[0] not in EXCLUDED and name not in covered
+    )
+
+
+def send(request):
+    method, url, kwargs = request
+    response = method(url, **kwargs)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    if response.status_code >= 400:
+        raise RuntimeError(f'{url}: ответ {response.status_code}')
+
+
+def timed(prepare, repeat):
+    """
+    Медиана времени repeat вызовов в миллисекундах.
+
+    prepare() возвращает функцию для замера и в замер не входит.
+    """
+    # Как timeit: сборка мусора в случайный момент даёт больше шума,
+    # чем разницы между прогонами.
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            call = prepare()
+            start = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return round(statistics.median(timings) * 1000, 3)
+
+
+def profile(prepare):
+    """Число SQL-запросов и пик памяти одного запроса после прогревочного."""
+    from yacommon.request_stats import QueryCounter
+
+    send(prepare())
+    request, counter = prepare(), QueryCounter()
+    tracemalloc.start()
+    try:
+        with counter.installed():
+            send(request)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'queries': counter.queries, 'peak_kib': round(peak / 1024, 1)}
+
+
+def measure(data, repeat, rounds):
+    """
+    Метрики всех сценариев на одной БД.
+
+    Время — лучшая из медиан за rounds проходов по всем сценариям:
+    временное замедление машины испортит один проход, а не все.
+    """
+    prepares = {
+        label: partial(func, data) for label, (_, func) in SCENARIOS.items()
+    }
+    metrics = {label: profile(prepare) for label, prepare in prepares.items()}
+    for _ in range(rounds):
+        for label, prepare in prepares.items():
+            elapsed = timed(lambda: partial(send, prepare()), repeat)
+            metrics[label]['time_ms'] = min(
+                metrics[label].get('time_ms', math.inf), elapsed
+            )
+    return metrics
+
+
+def exceeds(metric, old, new, args):
+    limit = {
+        'queries': old + args.query_threshold,
+        'time_ms': old * (1 + args.threshold),
+        'peak_kib': old * (1 + args.memory_threshold),
+    }[metric]
+    return new > limit and new - old > NOISE[metric]
+
+
+def regressions(results, baseline, args):
+    """Строки с описанием метрик, вышедших за пороги базового уровня."""
+    found = []
+    for label, sizes in results.items():
+        for size, metrics in sizes.items():
+            old = baseline.get(label, {}).get(size)
+            if old is None:
+                continue
+            for metric, value in metrics.items():
+                if exceeds(metric, old[metric], value, args):
+                    found.append(
+                        f'{label} [{size}] {metric}: {old[metric]} → {value}'
+                    )
+    return found
+
+
+def run(sizes, repeat, rounds):
+    """Результаты всех сценариев на БД каждого размера."""
+    results = {label: {} for label in SCENARIOS}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            with fresh_database(directory, f'routes-{size}'):
+                metrics = measure(Dataset(size), repeat, rounds)
+            print(f'Новостей: {size}')
+            for label, values in metrics.items():
+                results[label][str(size)] = values
+                print(f'{label:>28}: SQL {values["queries"]:3}, '
+                      f'{values["time_ms"]:8.3f} мс, '
+                      f'{values["peak_kib"]:8.1f} КиБ')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=SIZES,
+        help='Сколько новостей в БД на каждом шаге.'
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument(
+        '--rounds', type=int, default=3,
+        help='Сколько раз замерять время каждого сценария.'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=0.5,
+        help='Допустимый относительный рост времени.'
+    )
+    parser.add_argument(
+        '--memory-threshold', type=float, default=0.25,
+        help='Допустимый относительный рост пика памяти.'
+    )
+    parser.add_argument(
+        '--query-threshold', type=int, default=0,
+        help='Сколько лишних SQL-запросов допустимо.'
+    )
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument(
+        '--save', action='store_true',
+        help='Записать результаты как базовый уровень.'
+    )
+    args = parser.parse_args()
+    setup_django()
+
+    missing = missing_routes()
+    if missing:
+        sys.exit(f'Нет сценариев для маршрутов: {", ".join(missing)}')
+    results = run(args.sizes, args.repeat, args.rounds)
+    if args.save:
+        args.baseline.write_text(json.dumps(
+            results, ensure_ascii=False, indent=2, sort_keys=True
+        ) + '\n', encoding='utf-8')
+        print(f'Базовый уровень записан в {args.baseline}')
+        return
+    if not args.baseline.exists():
+        sys.exit(f'Нет базового уровня {args.baseline}: запустите с --save.')
+    found = regressions(
+        results, json.loads(args.baseline.read_text(encoding='utf-8')), args
+    )
+    if found:
+        sys.exit('Регрессии:\n' + '\n'.join(found))
+    print('Регрессий нет.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Наполнение БД: генератор seed_news и загрузка фикстур.
+
+Сначала генерирует --news новостей, --users пользователей и
+--comments комментариев и выводит время. Затем выгружает через
+dumpdata меньший набор (--fixture-comments комментариев) и загружает
+его в чистую БД стандартным loaddata и командой load_fixtures.
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from . import fresh_database, setup_django
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--comments', type=int, default=1_000_000)
+    parser.add_argument('--fixture-comments', type=int, default=50_000)
+    args = parser.parse_args()
+    setup_django()
+    from django.core.management import call_command
+
+    from news.seed import generate
+
+    with tempfile.TemporaryDirectory() as directory:
+        with fresh_database(directory, 'seed'):
+            elapsed = timed(
+                generate, news=args.news, users=args.users,
+                comments=args.comments,
+            )
+        print(f'seed_news: {args.news} новостей, {args.users} '
+              f'пользователей, {args.comments} комментариев за '
+              f'{elapsed:.1f} с ({args.comments / elapsed:.0f} '
+              f'комментариев/с)')
+
+        path = os.path.join(directory, 'fixture.json')
+        with fresh_database(directory, 'dump'):
+            generate(
+                news=args.fixture_comments // 50,
+                users=args.fixture_comments // 50,
+                comments=args.fixture_comments,
+            )
+            call_command('dumpdata', 'auth.user', 'news', output=path)
+        for command in ('loaddata', 'load_fixtures'):
+            with fresh_database(directory, command):
+                elapsed = timed(
+                    call_command, command, path, verbosity=0,
+                    stdout=io.StringIO(),
+                )
+            print(f'{command:>13}: {args.fixture_comments} комментариев '
+                  f'за {elapsed:5.1f} с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Смешанная нагрузка на SQLite через настоящий HTTP-сервер.
+
+Несколько клиентов одновременно открывают страницы новостей и
+оставляют комментарии. Замер выполняется дважды, в отдельных процессах:
+с настройками БД по умолчанию и с профилем DB_PROFILE=production.
+Для каждого выводятся пропускная способность, p50/p99 задержки и число
+ответов с ошибкой.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import percentile, seed_database, setup_django, test_database
+
+PROFILES = ('default', 'production')
+CSRF_INPUT = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def make_server(workers):
+    """WSGI-сервер с пулом потоков, как у gunicorn с --threads."""
+    from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    class PooledWSGIServer(WSGIServer):
+        request_queue_size = 128
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(workers)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self.handle_in_pool, request, client_address)
+
+        def handle_in_pool(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(get_wsgi_application())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class LoadClient:
+    """Один пользователь: своя сессия, свой CSRF-токен."""
+
+    def __init__(self, port, session_cookie):
+        self.port = port
+        self.cookies = {'sessionid': session_cookie}
+
+    def request(self, method, path, body=None):
+        headers = {
+            'Cookie': '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        }
+        if body is not None:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        finally:
+            connection.close()
+        for name, value in response.getheaders():
+            if name.lower() == 'set-cookie':
+                key, _, rest = value.partition('=')
+                self.cookies[key] = rest.split(';', 1)[0]
+        return response.status, content
+
+    def prepare(self, path):
+        status, content = self.request('GET', path)
+        self.csrf_token = CSRF_INPUT.search(content).group(1).decode()
+
+    def comment(self, path, number):
+        body = f'csrfmiddlewaretoken={self.csrf_token}&text=comment+{number}'
+        return self.request('POST', path, body)
+
+
+def run_clients(port, sessions, news_ids, args):
+    from django.urls import reverse
+
+    paths = [reverse('news:detail', args=(pk,)) for pk in news_ids]
+    deadline = time.perf_counter() + args.duration
+    results = []
+
+    def work(number, session_cookie):
+        rng = random.Random(number)
+        client = LoadClient(port, session_cookie)
+        client.prepare(paths[0])
+        timings, errors = [], 0
+        while time.perf_counter() < deadline:
+            path = rng.choice(paths)
+            start = time.perf_counter()
+            if rng.random() < args.write_share:
+                status, _ = client.comment(path, len(timings))
+                failed = status != 302
+            else:
+                status, _ = client.request('GET', path)
+                failed = status != 200
+            timings.append(time.perf_counter() - start)
+            errors += failed
+        results.append((timings, errors))
+
+    threads = [
+        threading.Thread(target=work, args=(number, session_cookie))
+        for number, session_cookie in enumerate(sessions)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    timings = [timing for part, _ in results for timing in part]
+    return {
+        'requests': len(timings),
+        'rps': len(timings) / elapsed,
+        'p50': percentile(timings, 50),
+        'p99': percentile(timings, 99),
+        'errors': sum(errors for _, errors in results),
+    }
+
+
+def worker(args):
+    """Один замер в текущем процессе и с текущим профилем."""
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+
+    # WAL и mmap работают только с файлом, поэтому БД не в памяти.
+    directory = tempfile.TemporaryDirectory()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory.name, 'load.sqlite3'
+    )
+    with directory, test_database():
+        news_ids = seed_database(args.news, args.comments)
+        sessions = []
+        for number in range(args.clients):
+            user = get_user_model().objects.create(username=f'user{number}')
+            client = Client()
+            client.force_login(user)
+            sessions.append(client.cookies['sessionid'].value)
+        connection.close()
+        server = make_server(args.workers)
+        try:
+            result = run_clients(
+                server.server_address[1], sessions, news_ids, args
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--write-share', type=float, default=0.2)
+    parser.add_argument('--news', type=int, default=200)
+    parser.add_argument('--comments', type=int, default=20,
+                        help='Комментариев на новость в среднем.')
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+    print(f'Клиентов: {args.clients}, потоков сервера: {args.workers}, '
+          f'доля записей: {args.write_share:.0%}, {args.duration:.0f} с')
+    for profile in PROFILES:
+        # Настройки БД читаются при импорте, поэтому каждый профиль
+        # замеряется в отдельном процессе.
+        output = subprocess.run(
+            [sys.executable, '-m', __spec__.name, '--worker', *sys.argv[1:]],
+            env={**os.environ, 'DB_PROFILE': profile},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{profile:>10}: {result["rps"]:7.0f} запросов/с, '
+              f'p50 {result["p50"] * 1000:6.1f} мс, '
+              f'p99 {result["p99"] * 1000:6.1f} мс, '
+              f'ошибок {result["errors"]} из {result["requests"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,84 @@
+import copy
+from types import SimpleNamespace
+
 import pytest
 # Импортируем модель заметки, чтобы создать экземпляр.
-from news.models import News, Comment
+from news.models import News, Comment, new_version
+from news.seed import bulk_insert
+from news.utils import comment_count_subquery
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from yacommon.auth_backends import USER_CACHE
+from yacommon.testing import fast_password_hasher  # noqa: F401
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кэши живут в памяти процесса и не откатываются вместе с БД.
+    cache.clear()
+    USER_CACHE.clear()
+    yield
+    cache.clear()
+    USER_CACHE.clear()
+
+
+@pytest.fixture(scope='module')
+def module_data(django_db_setup, django_db_blocker):
+    """
+    Автор и новость, общие для всех тестов модуля.
+
+    Модуль подключает их строкой
+    pytestmark = pytest.mark.usefixtures('module_data'), и тогда
+    фикстуры author и news отдают копии этих объектов вместо новых.
+    Объекты создаются один раз в транзакции, которая откатывается после
+    модуля, а каждый тест идёт в своей точке сохранения внутри неё, как
+    в TestCase с setUpTestData. Поэтому модулю с транзакционными тестами
+    (transaction=True) подключать их нельзя.
+    """
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+    try:
+        with django_db_blocker.unblock():
+            data = SimpleNamespace(
+                author=create_author(get_user_model()),
+                news=create_news(),
+            )
+        yield data
+    finally:
+        with django_db_blocker.unblock():
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
+
+
+def shared_copy(request, name):
+    """Копия объекта name из module_data, если модуль её подключил."""
+    if 'module_data' not in request.fixturenames:
+        return None
+    # Копия на каждый тест, как в TestCase: изменения объекта в одном
+    # тесте не видны следующим.
+    return copy.deepcopy(getattr(request.getfixturevalue('module_data'), name))
+
+
+def create_author(user_model):
+    return user_model.objects.create(username='Автор')
+
+
+def create_news():
+    return News.objects.create(
+        title='Заголовок',
+        text='Текст заметки',
+    )
 
 
 @pytest.fixture
 # Используем встроенную фикстуру для модели пользователей django_user_model.
-def author(django_user_model):
-    return django_user_model.objects.create(username='Автор')
+def author(request, django_user_model):
+    return shared_copy(request, 'author') or create_author(django_user_model)
 
 
 @pytest.fixture
@@ -18,11 +88,8 @@ def author_client(author, client):  # Вызываем фикстуру авто
 
 
 @pytest.fixture
-def news():
-    return News.objects.create(
-        title='Заголовок',
-        text='Текст заметки',
-    )
+def news(request):
+    return shared_copy(request, 'news') or create_news()
 
 
 @pytest.fixture
@@ -49,13 +116,19 @@ def news_list():
 
 @pytest.fixture
 def comment_list(news, author):
-    now = datetime.today()
-    for index in range(2):
-        comment = Comment.objects.create(
+    now = timezone.now()
+    # bulk_create подменил бы created текущим временем (auto_now_add).
+    bulk_insert(Comment, [
+        Comment(
             news=news, author=author, text=f'Текст {index}',
+            created=now + timedelta(days=index),
         )
-        comment.created = now + timedelta(days=index)
-        comment.save()
+        for index in range(2)
+    ])
+    # Сигналы при вставке не отправляются: счётчик и кэш обновляем сами.
+    News.objects.filter(pk=news.pk).update(
+        comment_count=comment_count_subquery(), version=new_version()
+    )
 
 
 @pytest.fixture
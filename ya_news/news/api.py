@@ -0,0 +1,200 @@
+"""
+JSON API для чтения новостей и комментариев.
+
+Параметр ?fields= выбирает поля ответа, и из БД читаются только нужные
+столбцы. Списки листаются курсором по ключу сортировки (параметр
+?cursor=, следующая страница — в поле next) и отдаются потоком: страница
+сериализуется по одной записи, а не собирается в памяти целиком.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BigIntegerField, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import generic
+
+from .models import Comment, News
+from .utils import decode_cursor, encode_position
+
+
+class ApiError(Exception):
+    """Ошибка в параметрах запроса, отвечаем 400."""
+
+
+def dump(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def stream_page(rows, names, limit):
+    """
+    Страница списка в JSON по частям.
+
+    Каждая строка rows — значения полей names и в конце ключ курсора
+    (значение сортировки, id). Строк на одну больше, чем limit: лишняя
+    говорит, что есть следующая страница.
+    """
+    yield '{"results": ['
+    next_cursor = None
+    previous = None
+    for number, row in enumerate(rows):
+        if number == limit:
+            next_cursor = encode_position(*previous[-2:])
+            break
+        yield (',' if number else '') + dump(dict(zip(names, row)))
+        previous = row
+    yield '], "next": ' + dump(next_cursor) + '}'
+
+
+class ApiView(generic.View):
+    """Основа представлений API."""
+    # Имя поля в ответе -> путь для values_list().
+    fields = {}
+    default_fields = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+    def get_fields(self):
+        """Поля из ?fields=id,title в порядке запроса."""
+        value = self.request.GET.get('fields', '')
+        names = list(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        if not names:
+            return list(self.default_fields)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(
+                'Неизвестные поля: ' + ', '.join(unknown) + '. Доступны: '
+                + ', '.join(self.fields)
+            )
+        return names
+
+    def get_limit(self):
+        value = self.request.GET.get('limit')
+        if value is None:
+            return settings.NEWS_API_PAGE_SIZE
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.NEWS_API_MAX_PAGE_SIZE:
+            raise ApiError(
+                'limit должен быть от 1 до '
+                f'{settings.NEWS_API_MAX_PAGE_SIZE}.'
+            )
+        return limit
+
+    def get_cursor(self):
+        cursor = self.request.GET.get('cursor')
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor)
+        except ValueError:
+            raise ApiError('Некорректный курсор.')
+
+    def get_pk(self):
+        """
+        pk из адреса; None, если такого id не может быть в БД.
+
+        Число больше BigIntegerField драйвер БД не передал бы в запрос.
+        """
+        pk = self.kwargs['pk']
+        return pk if pk <= BigIntegerField.MAX_BIGINT else None
+
+    def not_found(self):
+        return JsonResponse({'error': 'Не найдено.'}, status=404)
+
+
+class ListApiView(ApiView):
+    """Список с курсором по ключу (key, id), отдаётся потоком."""
+    key = None
+
+    def get_queryset(self, cursor):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_fields()
+        limit = self.get_limit()
+        queryset = self.get_queryset(self.get_cursor())
+        if queryset is None:
+            return self.not_found()
+        paths = [self.fields[name] for name in names] + [self.key, 'id']
+        rows = queryset.values_list(*paths)[:limit + 1]
+        return StreamingHttpResponse(
+            stream_page(rows.iterator(), names, limit),
+            content_type='application/json',
+        )
+
+
+class NewsListApi(ListApiView):
+    """Новости от свежих к старым, в порядке индекса (-date, id)."""
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'text': 'text',
+        'date': 'date',
+        'comment_count': 'comment_count',
+    }
+    default_fields = ('id', 'title', 'date', 'comment_count')
+    key = 'date'
+
+    def get_queryset(self, cursor):
+        queryset = News.objects.order_by('-date', 'id')
+        if cursor is not None:
+            date, pk = cursor
+            queryset = queryset.filter(
+                Q(date__lt=date.date()) | Q(date=date.date(), pk__gt=pk)
+            )
+        return queryset
+
+
+class NewsDetailApi(ApiView):
+    fields = NewsListApi.fields
+    default_fields = tuple(NewsListApi.fields)
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_fields()
+        pk = self.get_pk()
+        if pk is None:
+            return self.not_found()
+        row = News.objects.filter(pk=pk).values_list(
+            *(self.fields[name] for name in names)
+        ).first()
+        if row is None:
+            return self.not_found()
+        return JsonResponse(
+            dict(zip(names, row)), json_dumps_params={'ensure_ascii': False}
+        )
+
+
+class CommentListApi(ListApiView):
+    """Комментарии новости в порядке (created, id), как на странице."""
+    fields = {
+        'id': 'id',
+        'news': 'news_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }
+    default_fields = ('id', 'author', 'text', 'created')
+    key = 'created'
+
+    def get_queryset(self, cursor):
+        pk = self.get_pk()
+        if pk is None or not News.objects.filter(pk=pk).exists():
+            return None
+        queryset = Comment.objects.filter(news_id=pk).order_by(
+            *Comment._meta.ordering
+        )
+        if cursor is not None:
+            created, pk = cursor
+            queryset = queryset.filter(
+                Q(created__gt=created) | Q(created=created, pk__gt=pk)
+            )
+        return queryset
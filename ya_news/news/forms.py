@@ -2,13 +2,12 @@ from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .moderation import BAD_WORDS, get_matcher  # noqa: F401
 
-BAD_WORDS = (
-    'редиска',
-    'негодяй',
-    # Дополните список на своё усмотрение.
-)
 WARNING = 'Не ругайтесь!'
+FRAGMENT_WARNING = (
+    'Недопустимый фрагмент «%(fragment)s» в позиции %(position)d.'
+)
 
 
 class CommentForm(ModelForm):
@@ -20,8 +19,17 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        match = get_matcher().search(text)
+        if match is not None:
+            raise ValidationError([
+                ValidationError(WARNING, code='bad_word'),
+                ValidationError(
+                    FRAGMENT_WARNING,
+                    code='bad_word_fragment',
+                    params={
+                        'fragment': match.fragment,
+                        'position': match.start + 1,
+                    },
+                ),
+            ])
         return text
@@ -0,0 +1,106 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.models import Comment
+from news.moderation import get_matcher
+
+
+class Command(BaseCommand):
+    help = (
+        'Повторно проверяет сохранённые комментарии на запрещённые слова. '
+        'Комментарии читаются пачками по возрастанию id, нарушители '
+        'помечаются или удаляются одним запросом на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--action', choices=('flag', 'delete'), default='flag',
+            help='Пометить нарушителей (по умолчанию) или удалить их.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько комментариев читать и обрабатывать за раз.'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл, где хранится id последнего проверенного комментария.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать сначала, даже если в checkpoint есть прогресс.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        self.checkpoint = options['checkpoint']
+        last_id = 0 if options['restart'] else self.read_checkpoint()
+        matcher = get_matcher()
+        scanned = violators = 0
+        started = time.perf_counter()
+        while True:
+            batch_last_id, batch_scanned, bad_ids = self.scan_chunk(
+                matcher, last_id, options['chunk_size']
+            )
+            if not batch_scanned:
+                break
+            self.apply(options['action'], bad_ids)
+            last_id = batch_last_id
+            self.write_checkpoint(last_id)
+            scanned += batch_scanned
+            violators += len(bad_ids)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Проверено до id={last_id}: {scanned}')
+        elapsed = time.perf_counter() - started
+        rate = scanned / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено: {scanned}, нарушителей: {violators}, '
+            f'{rate:.0f} комментариев/с, последний id: {last_id}'
+        ))
+
+    def scan_chunk(self, matcher, last_id, chunk_size):
+        """
+        Проверяет следующую пачку комментариев после last_id.
+
+        Курсор пачки дочитывается до конца до того, как мы пишем в таблицу:
+        SQLite не изолирует чтение и запись внутри одного соединения.
+        """
+        queryset = Comment.objects.filter(pk__gt=last_id).order_by(
+            'pk'
+        ).values_list('pk', 'text')[:chunk_size]
+        scanned = 0
+        bad_ids = []
+        for pk, text in queryset.iterator(chunk_size=chunk_size):
+            scanned += 1
+            last_id = pk
+            if matcher.search(text) is not None:
+                bad_ids.append(pk)
+        return last_id, scanned, bad_ids
+
+    def apply(self, action, bad_ids):
+        if not bad_ids:
+            return
+        queryset = Comment.objects.filter(pk__in=bad_ids)
+        if action == 'delete':
+            # CommentQuerySet.delete() поправит счётчики и версии новостей.
+            queryset.delete()
+        else:
+            queryset.update(is_flagged=True)
+
+    def read_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint, encoding='utf-8') as file:
+            return json.load(file)['last_id']
+
+    def write_checkpoint(self, last_id):
+        """Пишем через временный файл, чтобы прерывание не испортило его."""
+        if not self.checkpoint:
+            return
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'last_id': last_id}, file)
+        os.replace(temporary, self.checkpoint)
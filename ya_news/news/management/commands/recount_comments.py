@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import News, new_version
+from news.utils import comment_count_subquery
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает News.comment_count с нуля. Нужен после массовых '
+        'операций, которые не отправляют сигналы (bulk_create, raw SQL).'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = News.objects.update(
+                comment_count=comment_count_subquery(), version=new_version()
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано новостей: {updated}')
+        )
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.seed import generate
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет БД синтетическими новостями, пользователями и '
+        'комментариями для нагрузочных замеров. Даты, популярность '
+        'новостей и длины текстов распределены как на живом сайте; всё '
+        'пишется пачками в одной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=100_000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней публиковались новости.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одно зерно — одни и те же данные.'
+        )
+
+    def handle(self, *args, **options):
+        counts = ('news', 'users', 'comments', 'days')
+        if any(options[name] < 0 for name in counts):
+            raise CommandError('Количества не могут быть отрицательными.')
+        started = time.perf_counter()
+        try:
+            generate(**{name: options[name] for name in (*counts, 'seed')})
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано новостей: {options["news"]}, пользователей: '
+            f'{options["users"]}, комментариев: {options["comments"]} '
+            f'за {time.perf_counter() - started:.1f} с'
+        ))
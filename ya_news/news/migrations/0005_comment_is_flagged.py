@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_flagged',
+            field=models.BooleanField(default=False, help_text='Найдено запрещённое слово при повторной проверке.', verbose_name='Требует модерации'),
+        ),
+    ]
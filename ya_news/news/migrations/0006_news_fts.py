@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Полнотекстовый индекс SQLite FTS5 по заголовкам и текстам новостей.
+# Индекс хранит только термы (content='news_news'), триггеры обновляют его
+# при каждой записи новости, в том числе из админки. Изменение счётчика
+# комментариев индекс не трогает: триггер следит только за title и text.
+#
+# Внимание: если SQLite «пересоздаёт» news_news (так выполняются AddField
+# и многие AlterField), триггеры пропадают вместе со старой таблицей.
+# Такие миграции должны создать их заново и перестроить индекс.
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE news_news_fts USING fts5(
+    title, text,
+    content='news_news', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+CREATE_TRIGGERS = (
+    """
+    CREATE TRIGGER news_news_fts_insert AFTER INSERT ON news_news BEGIN
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_fts_delete AFTER DELETE ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_fts_update AFTER UPDATE OF title, text
+    ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+REBUILD = "INSERT INTO news_news_fts(news_news_fts) VALUES ('rebuild')"
+DROP = (
+    'DROP TRIGGER IF EXISTS news_news_fts_insert',
+    'DROP TRIGGER IF EXISTS news_news_fts_delete',
+    'DROP TRIGGER IF EXISTS news_news_fts_update',
+    'DROP TABLE IF EXISTS news_news_fts',
+)
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in (CREATE_TABLE, *CREATE_TRIGGERS, REBUILD):
+        schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_is_flagged'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.15 on 2026-10-18 23:10
+from importlib import import_module
+
+from django.db import migrations, models
+
+# AddField на SQLite пересоздаёт news_news, и триггеры полнотекстового
+# индекса пропадают вместе со старой таблицей (см. 0006_news_fts).
+fts = import_module('news.migrations.0006_news_fts')
+
+
+def recreate_fts_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in (*fts.DROP[:-1], *fts.CREATE_TRIGGERS, fts.REBUILD):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_news_fts'),
+    ]
+
+    operations = [
+        # При откате RemoveField тоже пересоздаёт таблицу.
+        migrations.RunPython(migrations.RunPython.noop, recreate_fts_triggers),
+        migrations.AddField(
+            model_name='news',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recreate_fts_triggers, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,38 @@
+import time
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+
+def new_version():
+    """
+    Новое значение News.version: текущее время в наносекундах.
+
+    Каждая правка получает своё значение, поэтому ключ кэша с версией
+    не совпадёт ни с одним из прежних, даже если правки из разных
+    процессов запишутся не в том порядке.
+    """
+    return time.time_ns()
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Версия кэшированной страницы новости: время последней правки новости
+    # или её комментариев в наносекундах (см. signals). Хранится в БД,
+    # поэтому все процессы видят одну и ту же версию.
+    version = models.PositiveBigIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', 'id'), name='news_date_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -18,20 +40,81 @@ class News(models.Model):
         return self.title
 
 
+def discount_comments(comments):
+    """
+    Вычитает комментарии comments из счётчиков их новостей.
+
+    Вызывается до удаления: один UPDATE со сгруппированным подзапросом
+    на все затронутые новости, сколько бы комментариев ни удалялось.
+    """
+    per_news = comments.filter(news=OuterRef('pk')).order_by().values(
+        'news'
+    ).annotate(total=Count('pk')).values('total')
+    News.objects.filter(pk__in=comments.values('news')).update(
+        comment_count=Greatest(F('comment_count') - Subquery(per_news), 0),
+        version=new_version(),
+    )
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def delete(self):
+        """
+        Удаляет комментарии, обновляя счётчики их новостей.
+
+        У Comment нет обработчиков сигналов удаления, поэтому Django
+        удаляет комментарии одним DELETE, в том числе каскадом вместе
+        с новостью. Удаление через QuerySet (например, в
+        moderate_comments) поправляет счётчики здесь, одним запросом.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            discount_comments(self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Comment(models.Model):
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
     )
+    # Отдельный индекс по author_id не нужен: поиск по автору, в том числе
+    # каскадное удаление, обслуживает comment_author_idx (author, id).
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    is_flagged = models.BooleanField(
+        'Требует модерации',
+        default=False,
+        help_text='Найдено запрещённое слово при повторной проверке.'
+    )
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
-        ordering = ('created',)
+        ordering = ('created', 'id')
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(fields=('author', 'id'), name='comment_author_idx'),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def delete(self, using=None, keep_parents=False):
+        """Удаление одного комментария, например из представления."""
+        with transaction.atomic(using=using, savepoint=False):
+            News.objects.filter(
+                pk=self.news_id, comment_count__gt=0
+            ).update(comment_count=F('comment_count') - 1,
+                     version=new_version())
+            return super().delete(using=using, keep_parents=keep_parents)
@@ -0,0 +1,139 @@
+"""
+Поиск запрещённых слов в тексте комментариев.
+
+Весь список слов компилируется в одно регулярное выражение, устроенное
+как префиксное дерево: общие начала слов проверяются один раз, поэтому
+время поиска почти не зависит от длины списка.
+"""
+import os
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+BadWordMatch = namedtuple('BadWordMatch', ('start', 'end', 'fragment'))
+
+BAD_WORDS = (
+    'редиска',
+    'негодяй',
+    # Дополните список на своё усмотрение.
+)
+
+
+def build_trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return trie
+
+
+def trie_to_regex(node):
+    """Превращает поддерево в регулярное выражение без возвратов по списку."""
+    optional = '' in node
+    branches = [
+        re.escape(char) + trie_to_regex(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if optional else pattern
+
+
+def compile_words(words):
+    """
+    Компилирует список слов в одно выражение.
+
+    Слова приводятся к нижнему регистру: искать выражение без IGNORECASE
+    в заранее приведённом тексте в несколько раз быстрее.
+    """
+    words = {word.strip().lower() for word in words if word.strip()}
+    if not words:
+        return None
+    return re.compile(trie_to_regex(build_trie(words)))
+
+
+def lower_keeping_positions(text):
+    """
+    Текст в нижнем регистре той же длины, что и исходный.
+
+    Для редких символов вроде «İ» str.lower() удлиняет строку, тогда
+    приводим посимвольно, чтобы позиции совпадений не съехали.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(char.lower()[:1] for char in text)
+
+
+class BadWordMatcher:
+    """Скомпилированный список запрещённых слов."""
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self.pattern = compile_words(self.words)
+
+    def search(self, text):
+        """Первое совпадение (BadWordMatch) или None."""
+        return next(self.finditer(text), None)
+
+    def finditer(self, text):
+        """Все совпадения с их позициями в исходном тексте."""
+        if self.pattern is None:
+            return
+        for match in self.pattern.finditer(lower_keeping_positions(text)):
+            start, end = match.span()
+            yield BadWordMatch(start, end, text[start:end])
+
+
+def read_words_file(path):
+    """Одно слово в строке; пустые строки и строки с # пропускаются."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            line.strip() for line in file
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+
+
+def words_source():
+    """Файл со словами из настроек BAD_WORDS_FILE и время его изменения."""
+    path = getattr(settings, 'BAD_WORDS_FILE', None)
+    if not path:
+        return None, None
+    return path, os.stat(path).st_mtime_ns
+
+
+_matcher = None
+_matcher_source = None
+
+
+def get_matcher():
+    """
+    Возвращает скомпилированный список слов.
+
+    Список собирается один раз на процесс, при запуске в yanews.wsgi и
+    yanews.asgi, и пересобирается, только если поменялся файл со
+    словами или настройки.
+    """
+    global _matcher, _matcher_source
+    source = words_source()
+    if _matcher is None or source != _matcher_source:
+        path, _ = source
+        words = read_words_file(path) if path else BAD_WORDS
+        _matcher = BadWordMatcher(words)
+        _matcher_source = source
+    return _matcher
+
+
+@receiver(setting_changed)
+def reset_matcher(setting=None, **kwargs):
+    global _matcher
+    if setting in (None, 'BAD_WORDS_FILE'):
+        _matcher = None
@@ -0,0 +1,121 @@
+import json
+from datetime import date, datetime
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from news.models import Comment, News
+from news.utils import encode_position
+
+pytestmark = pytest.mark.usefixtures('module_data')
+
+
+def get_json(client, url, **params):
+    response = client.get(url, params)
+    if response.streaming:
+        content = b''.join(response.streaming_content)
+    else:
+        content = response.content
+    return response.status_code, json.loads(content)
+
+
+def collect_pages(client, url, **params):
+    """Все страницы списка подряд, по курсору из поля next."""
+    results = []
+    while True:
+        status, page = get_json(client, url, **params)
+        assert status == HTTPStatus.OK
+        results += page['results']
+        if page['next'] is None:
+            return results
+        params['cursor'] = page['next']
+
+
+@pytest.fixture
+def same_day_news():
+    # Одна дата у всех: порядок внутри дня задаёт id.
+    return [
+        News.objects.create(
+            title=f'Новость {index}', text='Текст', date=date(2022, 1, 1)
+        )
+        for index in range(5)
+    ]
+
+
+@pytest.mark.django_db
+def test_news_list_pages_follow_home_order(client, news_list, same_day_news):
+    url = reverse('news:api-news-list')
+    results = collect_pages(client, url, limit=3)
+    expected = list(News.objects.order_by('-date', 'id'))
+    assert [item['id'] for item in results] == [news.pk for news in expected]
+    assert set(results[0]) == {'id', 'title', 'date', 'comment_count'}
+
+
+@pytest.mark.django_db
+def test_news_list_loads_only_requested_columns(client, news):
+    url = reverse('news:api-news-list')
+    with CaptureQueriesContext(connection) as queries:
+        status, page = get_json(client, url, fields='title')
+    assert status == HTTPStatus.OK
+    assert page == {'results': [{'title': news.title}], 'next': None}
+    assert '"text"' not in queries.captured_queries[-1]['sql']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', (
+    {'fields': 'title,password'},
+    {'limit': '0'},
+    {'limit': 'много'},
+    {'cursor': 'не-курсор'},
+    {'cursor': encode_position(date(2020, 1, 1), 10 ** 30)},
+))
+def test_news_list_rejects_bad_params(client, params):
+    status, body = get_json(client, reverse('news:api-news-list'), **params)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert 'error' in body
+
+
+@pytest.mark.django_db
+def test_news_detail(client, news):
+    url = reverse('news:api-news-detail', args=(news.pk,))
+    status, body = get_json(client, url, fields='id,text')
+    assert status == HTTPStatus.OK
+    assert body == {'id': news.pk, 'text': news.text}
+    url = reverse('news:api-news-detail', args=(news.pk + 1,))
+    status, body = get_json(client, url)
+    assert status == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated_in_page_order(client, author, news):
+    for index in range(5):
+        Comment.objects.create(news=news, author=author, text=f'К{index}')
+    url = reverse('news:api-comments', args=(news.pk,))
+    results = collect_pages(client, url, limit=2)
+    assert [item['text'] for item in results] == [
+        f'К{index}' for index in range(5)
+    ]
+    assert results[0]['author'] == author.username
+    url = reverse('news:api-comments', args=(news.pk + 1,))
+    status, body = get_json(client, url)
+    assert status == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comments_reject_out_of_range_cursor(client, news):
+    url = reverse('news:api-comments', args=(news.pk,))
+    cursor = encode_position(datetime(2020, 1, 1), 2 ** 63)
+    status, body = get_json(client, url, cursor=cursor)
+    assert status == HTTPStatus.BAD_REQUEST
+    assert 'error' in body
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', ('news:api-news-detail', 'news:api-comments'))
+def test_out_of_range_pk_is_not_found(client, name):
+    url = reverse(name, args=(2 ** 63,))
+    status, body = get_json(client, url)
+    assert status == HTTPStatus.NOT_FOUND
+    assert 'error' in body
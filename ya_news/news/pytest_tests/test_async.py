@@ -0,0 +1,52 @@
+"""
+Асинхронные представления.
+
+Представления ходят в БД из других потоков (db_sync_to_async), поэтому
+тесты транзакционные и module_data в этом модуле не подключается.
+"""
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.urls import reverse
+from news import views
+from news.models import Comment
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('sync_view, async_view, name', (
+    (views.NewsList, views.news_list_async, 'news:home'),
+    (views.NewsDetailView, views.news_detail_async, 'news:detail'),
+))
+def test_async_views_render_like_sync_views(
+    sync_view, async_view, name, news, comment
+):
+    kwargs = {'pk': news.pk} if name == 'news:detail' else {}
+    request = RequestFactory().get(reverse(name, kwargs=kwargs))
+    request.user = AnonymousUser()
+    expected = sync_view.as_view()(request, **kwargs).render().content
+
+    async def get():
+        return await async_view(request, **kwargs)
+
+    response = async_to_sync(get)()
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected
+
+
+@pytest.mark.django_db(transaction=True)
+def test_user_can_create_comment_through_async_view(author, news, form_data):
+    url = reverse('news:detail', args=(news.id,))
+    request = RequestFactory().post(url, form_data)
+    request.user = author
+
+    async def post():
+        return await views.news_detail_async(request, pk=news.pk)
+
+    response = async_to_sync(post)()
+    assert response.url == f'{url}#comments'
+    comment = Comment.objects.get()
+    assert comment.text == form_data['text']
+    assert comment.author == author
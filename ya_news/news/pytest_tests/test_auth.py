@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from yacommon.auth_backends import USER_CACHE
+from yacommon.request_stats import QueryCounter
+
+pytestmark = pytest.mark.usefixtures('module_data')
+
+ENGINES = ('cached_db', 'signed_cookies')
+
+
+def use_session_profile(settings, engine):
+    settings.SESSION_ENGINE = f'django.contrib.sessions.backends.{engine}'
+    settings.AUTHENTICATION_BACKENDS = [
+        'yacommon.auth_backends.CachedUserBackend'
+    ]
+    settings.USER_CACHE_TIMEOUT = 30
+
+
+def count_queries(user, url):
+    """Запросы к БД при повторном открытии url вошедшим пользователем."""
+    # Клиент создаётся после смены настроек: SessionMiddleware читает
+    # SESSION_ENGINE при загрузке.
+    client = Client()
+    client.force_login(user)
+    client.get(url)
+    # connection.queries сбрасывается в начале каждого запроса клиента,
+    # поэтому запросы считаем своей обёрткой.
+    counter = QueryCounter()
+    with counter.installed():
+        client.get(url)
+    return counter.queries
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('engine', ENGINES)
+def test_session_profile_skips_session_and_user_queries(
+        settings, author, news, engine
+):
+    url = reverse('news:detail', args=(news.pk,))
+    default = count_queries(author, url)
+    use_session_profile(settings, engine)
+    assert count_queries(author, url) == default - 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('engine', ENGINES)
+def test_password_change_logs_out_cached_user(
+        settings, author, comment, engine
+):
+    use_session_profile(settings, engine)
+    client = Client()
+    client.force_login(author)
+    url = reverse('news:edit', args=(comment.pk,))
+    assert client.get(url).status_code == HTTPStatus.OK
+    assert USER_CACHE.get(author.pk) == author
+    author.set_password('новый пароль')
+    author.save()
+    assert USER_CACHE.get(author.pk) is None
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url.startswith(reverse('users:login'))
+
+
+@pytest.mark.django_db
+def test_cache_returns_copies_and_is_off_by_default(author_client, author):
+    author_client.get(reverse('news:home'))
+    assert USER_CACHE.get(author.pk) is None
+    USER_CACHE.set(author.pk, author, timeout=30)
+    cached = USER_CACHE.get(author.pk)
+    assert cached == author
+    assert cached is not USER_CACHE.get(author.pk)
+    assert cached._state is not author._state
@@ -1,7 +1,19 @@
+import copy
+from datetime import datetime
+from http import HTTPStatus
+from pathlib import Path
+
 import pytest
 from django.conf import settings
+from django.template import engines
+from django.test import Client
 from django.urls import reverse
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.utils import encode_position
+from yacommon.warmup import warm_templates
+
+pytestmark = pytest.mark.usefixtures('module_data')
 
 
 @pytest.mark.django_db
@@ -39,3 +51,252 @@ def test_authorized_client_has_form(author_client, news):
     response = author_client.get(url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db
+def test_home_page_uses_comment_counter(
+    client, news, comment_list, django_assert_num_queries
+):
+    url = reverse('news:home')
+    # Дата свежей новости для ETag и сама лента.
+    with django_assert_num_queries(2):
+        response = client.get(url)
+    assert 'Комментариев: 2' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_home_page_supports_conditional_get(
+    author, news, comment, django_assert_num_queries
+):
+    client = Client()
+    url = reverse('news:home')
+    response = client.get(url)
+    etag = response['ETag']
+    assert 'Cookie' in response['Vary']
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    Comment.objects.create(news=news, author=author, text='Ещё один')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Комментариев: 2' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_home_page_etag_depends_on_user(author_client, news):
+    url = reverse('news:home')
+    anonymous_etag = Client().get(url)['ETag']
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=anonymous_etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != anonymous_etag
+
+
+@pytest.mark.django_db
+def test_anonymous_home_page_is_cached(
+    settings, author_client, news, django_assert_num_queries
+):
+    settings.NEWS_HOME_PAGE_CACHE_TIMEOUT = 60
+    client = Client()
+    url = reverse('news:home')
+    content = client.get(url).content
+    with django_assert_num_queries(1):
+        response = client.get(url)
+    assert response.content == content
+    assert 'Cookie' in response['Vary']
+    assert 'Выйти' in author_client.get(url).content.decode()
+    News.objects.create(title='Свежая новость', text='Текст')
+    assert 'Свежая новость' in client.get(url).content.decode()
+
+
+@pytest.mark.django_db
+def test_home_page_validators_are_shared_by_workers(
+    settings, author, news, comment
+):
+    # Комментарий добавлен в другом процессе, чей кэш этот процесс
+    # не видит: ETag и кэш страницы всё равно должны измениться.
+    settings.NEWS_HOME_PAGE_CACHE_TIMEOUT = 60
+    client = Client()
+    url = reverse('news:home')
+    etag = client.get(url)['ETag']
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'other-worker',
+    }}
+    Comment.objects.create(news=news, author=author, text='Ещё один')
+    del settings.CACHES
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Комментариев: 2' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated_by_cursor(
+    settings, client, news, comment_list, django_assert_num_queries
+):
+    settings.COMMENTS_PAGE_SIZE = 1
+    response = client.get(reverse('news:detail', args=(news.id,)))
+    first_page = response.context['comment_page'].comments
+    next_cursor = response.context['comment_page'].next_cursor
+    assert len(first_page) == 1
+    assert next_cursor is not None
+    url = reverse('news:comments', args=(news.id,))
+    with django_assert_num_queries(1):
+        response = client.get(url, {'cursor': next_cursor})
+    second_page = response.context['comment_page'].comments
+    assert len(second_page) == 1
+    assert first_page[0].created < second_page[0].created
+    assert response.context['comment_page'].next_cursor is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('cursor', (
+    'broken', encode_position(datetime(2020, 1, 1), 10 ** 30),
+))
+def test_comments_page_rejects_broken_cursor(client, news, cursor):
+    url = reverse('news:comments', args=(news.id,))
+    response = client.get(url, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('shift', (1, 10 ** 30))
+def test_comments_page_of_missing_news(client, news, shift):
+    url = reverse('news:comments', args=(news.id + shift,))
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_comments_page_of_news_without_comments(client, news):
+    response = client.get(reverse('news:comments', args=(news.id,)))
+    assert response.status_code == HTTPStatus.OK
+    assert 'Здесь никто ничего не написал' in response.content.decode()
+
+
+@pytest.fixture(params=('locmem', 'filebased'))
+def cache_backend(request, settings, tmp_path):
+    backends = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'filebased': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        },
+    }
+    settings.CACHES = {'default': backends[request.param]}
+    return request.param
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_is_served_from_cache(
+    cache_backend, author_client, news, comment, django_assert_num_queries
+):
+    client = Client()
+    url = reverse('news:detail', args=(news.id,))
+    client.get(url)
+    # Только новость: комментарии берутся из кэшированного фрагмента.
+    with django_assert_num_queries(1):
+        response = client.get(url)
+    assert comment.text in response.content.decode()
+    author_client.post(url, {'text': 'Свежий комментарий'})
+    response = client.get(url)
+    assert 'Свежий комментарий' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_detail_cache_sees_comments_from_other_workers(
+    settings, author, news, comment
+):
+    # У каждого процесса свой LocMemCache: комментарий, добавленный
+    # в другом процессе, его кэш не трогает.
+    def use_worker_cache(name):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': name,
+        }}
+
+    client = Client()
+    url = reverse('news:detail', args=(news.id,))
+    use_worker_cache('worker-a')
+    assert comment.text in client.get(url).content.decode()
+    use_worker_cache('worker-b')
+    Comment.objects.create(news=news, author=author, text='Из процесса B')
+    use_worker_cache('worker-a')
+    assert 'Из процесса B' in client.get(url).content.decode()
+
+
+@pytest.fixture
+def searchable_news():
+    return [
+        News.objects.create(title=title, text=text)
+        for title, text in (
+            ('Выборы мэра', 'Горожане выбрали нового мэра <b>города</b>.'),
+            ('Погода', 'Мэр пообещал, что дождей больше не будет.'),
+            ('Спорт', 'Команда выиграла матч.'),
+        )
+    ]
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_highlights(client, searchable_news):
+    response = client.get(reverse('news:search'), {'q': 'мэр'})
+    results = list(response.context['object_list'])
+    assert [news.pk for news in results] == [
+        news.pk for news in searchable_news[:2]
+    ]
+    assert results[0].title_highlighted == 'Выборы <mark>мэра</mark>'
+    assert '&lt;b&gt;города&lt;/b&gt;' in results[0].snippet
+
+
+@pytest.mark.django_db
+def test_search_is_paginated(settings, client, searchable_news):
+    settings.NEWS_SEARCH_PAGE_SIZE = 1
+    url = reverse('news:search')
+    response = client.get(url, {'q': 'мэр', 'page': 2})
+    assert response.context['paginator'].count == 2
+    assert list(response.context['object_list'])[0].pk == (
+        searchable_news[1].pk
+    )
+
+
+@pytest.mark.django_db
+def test_admin_edit_updates_search_index(admin_client, news):
+    url = reverse('admin:news_news_change', args=(news.pk,))
+    response = admin_client.post(url, {
+        'title': 'Открытие метро',
+        'text': news.text,
+        'date': news.date.strftime('%d.%m.%Y'),
+        'comment_set-TOTAL_FORMS': 0,
+        'comment_set-INITIAL_FORMS': 0,
+    })
+    assert response.status_code == HTTPStatus.FOUND
+    response = admin_client.get(reverse('news:search'), {'q': 'метро'})
+    assert [item.pk for item in response.context['object_list']] == [news.pk]
+
+
+def test_warm_up_compiles_every_template(settings):
+    templates = copy.deepcopy(settings.TEMPLATES)
+    templates[0]['APP_DIRS'] = False
+    templates[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader',
+        ['django.template.loaders.filesystem.Loader'],
+    )]
+    settings.TEMPLATES = templates
+    settings.TEMPLATES_WARM_UP = True
+    directory = Path(settings.BASE_DIR) / 'templates'
+    expected = {
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob('*.html')
+    }
+    assert warm_templates() == len(expected)
+    loader = engines['django'].engine.template_loaders[0]
+    assert set(loader.get_template_cache) == expected
+
+
+def test_warm_up_is_off_by_default():
+    assert warm_templates() == 0
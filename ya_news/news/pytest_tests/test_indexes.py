@@ -0,0 +1,56 @@
+import pytest
+from django.test import RequestFactory
+from news.api import CommentListApi, NewsListApi
+from news.utils import comment_page_queryset, decode_cursor, encode_cursor
+from news.views import CommentUpdate, NewsList
+
+pytestmark = pytest.mark.usefixtures('module_data')
+
+
+def assert_uses_indexes(queryset):
+    """План SQLite не должен содержать полного обхода или сортировки."""
+    plan = queryset.explain()
+    assert 'USE TEMP B-TREE' not in plan, plan
+    for line in plan.splitlines():
+        if ' SCAN ' in f' {line} ':
+            assert 'USING' in line and 'INDEX' in line, plan
+
+
+def view_queryset(view_class, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+@pytest.mark.django_db
+def test_news_list_uses_date_index():
+    assert_uses_indexes(NewsList().get_queryset())
+
+
+@pytest.mark.django_db
+def test_comment_page_uses_news_created_index(news, comment):
+    assert_uses_indexes(comment_page_queryset(news.pk))
+    cursor = encode_cursor(comment)
+    assert_uses_indexes(comment_page_queryset(news.pk, cursor))
+
+
+@pytest.mark.django_db
+def test_own_comments_use_author_index(author, comment):
+    """Комментарии автора по порядку id читаются по comment_author_idx."""
+    queryset = view_queryset(
+        CommentUpdate, author, pk=comment.pk
+    ).order_by('id')
+    assert_uses_indexes(queryset)
+    assert 'USING INDEX comment_author_idx ' in queryset.explain()
+
+
+@pytest.mark.django_db
+def test_api_lists_use_indexes(news, comment):
+    cursor = decode_cursor(encode_cursor(comment))
+    assert_uses_indexes(NewsListApi().get_queryset(None))
+    assert_uses_indexes(NewsListApi().get_queryset(cursor))
+    view = CommentListApi(kwargs={'pk': news.pk})
+    assert_uses_indexes(view.get_queryset(None))
+    assert_uses_indexes(view.get_queryset(cursor))
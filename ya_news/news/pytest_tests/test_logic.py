@@ -1,10 +1,24 @@
+import importlib
+import json
+import os
+from io import StringIO
+
 import pytest
-from news.models import Comment
+from django.core.management import call_command
+from django.db import connection
+from news.models import Comment, News
 from django.urls import reverse
-from news.forms import WARNING, BAD_WORDS
+from django.utils import timezone
+from news import moderation
+from news.forms import BAD_WORDS, FRAGMENT_WARNING, WARNING, CommentForm
+from news.moderation import BadWordMatcher
+from news.seed import bulk_insert
+from news.utils import comment_count_subquery
 from pytest_django.asserts import assertFormError
 from random import choice
 
+pytestmark = pytest.mark.usefixtures('module_data')
+
 
 @pytest.mark.django_db
 def test_anonymous_user_cant_create_comment(client, news, form_data):
@@ -72,3 +86,248 @@ def test_user_cant_edit_comment(comment, client, form_data):
     client.post(url, form_data)
     comment.refresh_from_db()
     assert comment.text != form_data['text']
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_create_and_delete(
+    author_client, news, form_data
+):
+    url = reverse('news:detail', args=(news.id,))
+    author_client.post(url, form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.post(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_cascade(author, news, comment):
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    author.delete()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def add_comments(news, author, count):
+    """count комментариев author к news одной вставкой, со счётчиком."""
+    now = timezone.now()
+    bulk_insert(Comment, [
+        Comment(news=news, author=author, text=f'Текст {index}', created=now)
+        for index in range(count)
+    ])
+    News.objects.filter(pk=news.pk).update(
+        comment_count=comment_count_subquery()
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', (1, 500))
+def test_delete_news_num_queries(
+    author, news, count, django_assert_num_queries
+):
+    add_comments(news, author, count)
+    # Комментарии и новость удаляются двумя DELETE, сколько бы
+    # комментариев ни было: сигналы удаления у Comment не подключены.
+    with django_assert_num_queries(2):
+        news.delete()
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('count', (1, 500))
+def test_delete_author_num_queries(
+    author, news, count, django_user_model, django_assert_num_queries
+):
+    reader = django_user_model.objects.create(username='Читатель')
+    other_news = News.objects.create(title='Другая', text='Текст')
+    add_comments(news, author, count)
+    add_comments(other_news, author, count)
+    add_comments(news, reader, 1)
+    # Один UPDATE счётчиков всех новостей автора, DELETE его комментариев,
+    # групп, прав, записей журнала админки и его самого.
+    with django_assert_num_queries(6):
+        author.delete()
+    news.refresh_from_db()
+    other_news.refresh_from_db()
+    assert (news.comment_count, other_news.comment_count) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_queryset_delete_follows_comment_count(
+    author, news, django_user_model
+):
+    reader = django_user_model.objects.create(username='Читатель')
+    other_news = News.objects.create(title='Другая', text='Текст')
+    add_comments(news, author, 3)
+    add_comments(other_news, author, 2)
+    add_comments(news, reader, 1)
+    versions = set(News.objects.values_list('version', flat=True))
+    Comment.objects.filter(author=author).delete()
+    news.refresh_from_db()
+    other_news.refresh_from_db()
+    assert (news.comment_count, other_news.comment_count) == (1, 0)
+    assert not versions & {news.version, other_news.version}
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(news, comment):
+    News.objects.update(comment_count=42)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+# Сессия и пользователь — два запроса на каждый авторизованный POST.
+AUTH_QUERIES = 2
+
+
+@pytest.mark.django_db
+def test_create_comment_num_queries(
+    author_client, news, form_data, django_assert_num_queries
+):
+    url = reverse('news:detail', args=(news.id,))
+    # Новость, вставка комментария, обновление счётчика.
+    with django_assert_num_queries(AUTH_QUERIES + 3):
+        author_client.post(url, form_data)
+
+
+@pytest.mark.django_db
+def test_edit_comment_num_queries(
+    author_client, comment, form_data, django_assert_num_queries
+):
+    url = reverse('news:edit', args=(comment.id,))
+    # Комментарий вместе с новостью, его обновление и версия новости.
+    with django_assert_num_queries(AUTH_QUERIES + 3):
+        author_client.post(url, form_data)
+
+
+@pytest.mark.django_db
+def test_delete_comment_num_queries(
+    author_client, comment, django_assert_num_queries
+):
+    url = reverse('news:delete', args=(comment.id,))
+    # Комментарий, его удаление и обновление счётчика.
+    with django_assert_num_queries(AUTH_QUERIES + 3):
+        author_client.post(url)
+
+
+def test_matcher_agrees_with_substring_scan():
+    words = ('кот', 'котлета', 'лет', 'ёж', 'a.b')
+    matcher = BadWordMatcher(words)
+    for text in ('Котлета', 'полёт', 'ЁЖИК', 'axb', 'a.b', 'лес'):
+        expected = any(word in text.lower() for word in words)
+        assert (matcher.search(text) is not None) == expected, text
+
+
+@pytest.mark.django_db
+def test_bad_word_fragment_is_reported(author_client, news):
+    text = 'Ну ты и Редиска!'
+    url = reverse('news:detail', args=(news.id,))
+    response = author_client.post(url, {'text': text})
+    assertFormError(
+        response=response,
+        form='form',
+        field='text',
+        errors=FRAGMENT_WARNING % {
+            'fragment': 'Редиска', 'position': text.index('Редиска') + 1,
+        },
+    )
+
+
+def test_bad_words_are_loaded_from_file(settings, tmp_path):
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# Список\nзлодей\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(words_file)
+    form = CommentForm(data={'text': 'Злодей!'})
+    assert not form.is_valid()
+    words_file.write_text('редиска\n', encoding='utf-8')
+    os.utime(words_file, ns=(0, 0))
+    assert CommentForm(data={'text': 'Злодей!'}).is_valid()
+
+
+@pytest.mark.parametrize('module', ('yanews.wsgi', 'yanews.asgi'))
+def test_matcher_is_built_at_startup(module):
+    moderation.reset_matcher()
+    importlib.reload(importlib.import_module(module))
+    assert moderation._matcher is not None
+
+
+@pytest.fixture
+def moderated_comments(news, author):
+    return [
+        Comment.objects.create(news=news, author=author, text=text)
+        for text in ('Хороший текст', f'Какой {BAD_WORDS[0]}', 'Ещё текст')
+    ]
+
+
+@pytest.mark.django_db
+def test_moderate_comments_flags_violators(moderated_comments):
+    call_command('moderate_comments', chunk_size=2, stdout=StringIO())
+    flagged = Comment.objects.filter(is_flagged=True)
+    assert list(flagged) == [moderated_comments[1]]
+    assert Comment.objects.count() == len(moderated_comments)
+
+
+@pytest.mark.django_db
+def test_moderate_comments_deletes_and_resumes(moderated_comments, tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    checkpoint.write_text(
+        json.dumps({'last_id': moderated_comments[1].pk}), encoding='utf-8'
+    )
+    call_command(
+        'moderate_comments', action='delete', checkpoint=str(checkpoint),
+        stdout=StringIO()
+    )
+    # Нарушитель уже за контрольной точкой, поэтому не тронут.
+    assert Comment.objects.count() == len(moderated_comments)
+    call_command(
+        'moderate_comments', action='delete', checkpoint=str(checkpoint),
+        restart=True, stdout=StringIO()
+    )
+    assert Comment.objects.count() == len(moderated_comments) - 1
+    saved = json.loads(checkpoint.read_text(encoding='utf-8'))
+    assert saved['last_id'] == moderated_comments[-1].pk
+
+
+@pytest.mark.django_db
+def test_seed_news_command_generates_consistent_data():
+    news_before = News.objects.count()
+    call_command(
+        'seed_news', news=20, users=5, comments=300, days=30,
+        stdout=StringIO()
+    )
+    assert News.objects.count() == news_before + 20
+    assert Comment.objects.count() == 300
+    for news in News.objects.all():
+        assert news.comment_count == news.comment_set.count()
+    oldest = News.objects.order_by('date').first()
+    comments = Comment.objects.order_by('created')
+    assert timezone.localdate(comments.first().created) >= oldest.date
+    assert comments.last().created <= timezone.now()
+    assert comments.values('created').distinct().count() > 1
+    # Индексы, убранные на время вставки, на месте.
+    constraints = connection.introspection.get_constraints(
+        connection.cursor(), Comment._meta.db_table
+    )
+    assert {'comment_news_created_idx', 'comment_author_idx'} <= set(
+        constraints
+    )
+
+
+@pytest.mark.django_db
+def test_load_fixtures_matches_loaddata(django_assert_max_num_queries):
+    # Сравниваем только новости из фикстуры.
+    News.objects.all().delete()
+    call_command('loaddata', 'news', verbosity=0)
+    fields = ('title', 'text', 'date')
+    expected = list(News.objects.order_by(*fields).values_list(*fields))
+    News.objects.all().delete()
+    # Одна вставка на всю фикстуру, пересчёт счётчиков и точки сохранения.
+    with django_assert_max_num_queries(5):
+        call_command('load_fixtures', 'news', stdout=StringIO())
+    assert list(
+        News.objects.order_by(*fields).values_list(*fields)
+    ) == expected
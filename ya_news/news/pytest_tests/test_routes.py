@@ -3,12 +3,15 @@ from http import HTTPStatus
 from pytest_django.asserts import assertRedirects
 from django.urls import reverse
 
+pytestmark = pytest.mark.usefixtures('module_data')
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     'name',  # Имя параметра функции.
     # Значения, которые будут передаваться в name.
-    ('news:home', 'users:login', 'users:logout', 'users:signup')
+    ('news:home', 'news:search', 'news:api-news-list', 'users:login',
+     'users:logout', 'users:signup')
 )
 # Указываем имя изменяемого параметра в сигнатуре теста.
 def test_pages_availability_for_anonymous_user(client, name):
@@ -0,0 +1,108 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from yacommon.request_stats import STATS, Histogram, QueryCounter
+
+pytestmark = pytest.mark.usefixtures('module_data')
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    # Статистика живёт в памяти процесса и не откатывается вместе с БД.
+    STATS.reset()
+    yield
+    STATS.reset()
+
+
+@pytest.fixture
+def stats_on(settings):
+    settings.REQUEST_STATS = True
+
+
+@pytest.mark.django_db
+def test_stats_are_off_by_default(client, news):
+    response = client.get(reverse('news:detail', args=(news.pk,)))
+    assert response.status_code == HTTPStatus.OK
+    assert not hasattr(response.wsgi_request, 'request_metrics')
+    assert STATS.as_dict() == {}
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('stats_on', 'comment')
+def test_detail_page_metrics(client, news):
+    url = reverse('news:detail', args=(news.pk,))
+    # connection.queries сбрасывается в начале каждого запроса клиента,
+    # поэтому запросы считаем своей обёрткой.
+    counter = QueryCounter()
+    with counter.installed():
+        response = client.get(url)
+    client.get(url)
+    stats = STATS.as_dict()['news:detail']
+    assert stats['time_ms']['count'] == 2
+    assert stats['render_ms']['count'] == 2
+    assert 0 < stats['render_ms']['max'] <= stats['time_ms']['max']
+    assert stats['queries']['max'] == counter.queries
+    assert stats['response_bytes']['max'] == len(response.content)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('stats_on', 'comment')
+def test_streamed_response_is_recorded_when_sent(client, news):
+    response = client.get(reverse('news:api-comments', args=(news.pk,)))
+    assert response.streaming
+    assert 'news:api-comments' not in STATS.as_dict()
+    counter = QueryCounter()
+    with counter.installed():
+        content = b''.join(response.streaming_content)
+    stats = STATS.as_dict()['news:api-comments']
+    assert stats['response_bytes']['max'] == len(content)
+    assert stats['queries']['max'] > counter.queries > 0
+    assert stats['render_ms']['count'] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'user_client, enabled, expected_status',
+    (
+        (pytest.lazy_fixture('client'), True, HTTPStatus.FORBIDDEN),
+        (pytest.lazy_fixture('author_client'), True, HTTPStatus.FORBIDDEN),
+        (pytest.lazy_fixture('admin_client'), True, HTTPStatus.OK),
+        (pytest.lazy_fixture('admin_client'), False, HTTPStatus.NOT_FOUND),
+    )
+)
+def test_stats_endpoint_is_for_staff_only(
+        settings, user_client, enabled, expected_status
+):
+    settings.REQUEST_STATS = enabled
+    user_client.get(reverse('news:home'))
+    response = user_client.get(reverse('stats'))
+    assert response.status_code == expected_status
+    if expected_status == HTTPStatus.OK:
+        assert json.loads(response.content)['news:home']['time_ms'][
+            'count'
+        ] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('stats_on')
+def test_stats_dump_to_json(client, tmp_path):
+    client.get('/missing/')
+    STATS.dump(tmp_path / 'stats-{pid}.json')
+    dumped, = tmp_path.iterdir()
+    assert list(json.loads(dumped.read_text(encoding='utf-8'))) == [
+        '<unresolved>'
+    ]
+
+
+def test_histogram_percentiles_are_close():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.add(value)
+    for percent in (50, 90, 99):
+        exact = percent * 10
+        assert exact <= histogram.percentile(percent) < exact * 1.2
+    assert histogram.percentile(100) == 1000
+    assert sum(count for _, count in histogram.as_dict()['buckets']) == 1000
@@ -0,0 +1,100 @@
+"""
+Поиск по новостям.
+
+На SQLite используется полнотекстовый индекс FTS5 (см. миграцию
+0006_news_fts) с ранжированием bm25 и подсветкой найденных слов.
+На других СУБД — поиск подстрок через icontains без подсветки.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import News
+
+# Вес совпадения в заголовке и в тексте для ранжирования bm25.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+# Сколько слов показывать во фрагменте текста.
+SNIPPET_WORDS = 24
+# FTS5 не экранирует HTML, поэтому размечаем совпадения управляющими
+# символами, экранируем строку и только потом превращаем их в <mark>.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+SEARCH_SQL = f"""
+SELECT news_news.id, news_news.title, news_news.date,
+       news_news.comment_count,
+       highlight(news_news_fts, 0, '{MARK_START}', '{MARK_END}')
+           AS title_highlighted,
+       snippet(news_news_fts, 1, '{MARK_START}', '{MARK_END}', '…',
+               {SNIPPET_WORDS}) AS snippet
+FROM news_news_fts JOIN news_news ON news_news.id = news_news_fts.rowid
+WHERE news_news_fts MATCH %s
+ORDER BY bm25(news_news_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT})
+LIMIT %s OFFSET %s
+"""
+COUNT_SQL = 'SELECT count(*) FROM news_news_fts WHERE news_news_fts MATCH %s'
+
+
+def split_query(query):
+    """Слова запроса; знаки препинания и операторы FTS5 отбрасываются."""
+    return re.findall(r'\w+', query)
+
+
+def highlight(text):
+    return mark_safe(
+        escape(text)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class FulltextResults:
+    """
+    Результаты FTS5, которые читаются из БД постранично.
+
+    Paginator спрашивает count() и берёт срез — на каждое обращение
+    приходится ровно один запрос с LIMIT/OFFSET.
+    """
+
+    def __init__(self, words):
+        self.match = ' '.join(f'"{word}"*' for word in words)
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(COUNT_SQL, (self.match,))
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, page):
+        if not isinstance(page, slice) or page.step is not None:
+            raise TypeError('Поддерживаются только срезы без шага.')
+        offset = page.start or 0
+        results = list(News.objects.raw(
+            SEARCH_SQL, (self.match, page.stop - offset, offset)
+        ))
+        for news in results:
+            news.title_highlighted = highlight(news.title_highlighted)
+            news.snippet = highlight(news.snippet)
+        return results
+
+
+def icontains_results(words):
+    queryset = News.objects.all()
+    for word in words:
+        queryset = queryset.filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )
+    return queryset
+
+
+def search_news(query):
+    """Объект для Paginator: срезы отдают новости от самых релевантных."""
+    words = split_query(query)
+    if not words:
+        return News.objects.none()
+    if connection.vendor == 'sqlite':
+        return FulltextResults(words)
+    return icontains_results(words)
@@ -0,0 +1,283 @@
+"""
+Быстрое наполнение БД: синтетические данные и загрузка фикстур.
+
+loaddata сохраняет объекты по одному, а bulk_create вызывает pre_save
+полей, и auto_now_add подменяет Comment.created текущим временем.
+bulk_insert вставляет объекты пачками тем же путём, что bulk_create,
+но записывает значения полей как есть (raw, как loaddata).
+
+На миллионы комментариев не хватает и его: создание экземпляра модели
+и подготовка каждого поля стоят около 10 мкс на объект. Поэтому
+комментарии генератор пишет insert_rows — готовыми строками через
+executemany.
+
+Сигналы при этом не отправляются: счётчики комментариев и версии
+новостей обновляются в конце.
+"""
+import contextlib
+import itertools
+import math
+import random
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core import serializers
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Comment, News, new_version
+from .utils import comment_count_subquery
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+VOCABULARY_SIZE = 20_000
+# Тексты комментариев берутся из пула: генерировать миллион текстов
+# дольше, чем вставлять их, а распределение длин от этого не меняется.
+COMMENT_TEXT_POOL = 10_000
+# Сколько объектов собираем в памяти перед вставкой.
+SEED_CHUNK = 20_000
+# Средняя длина в словах: заголовок, текст новости, комментарий.
+TITLE_WORDS = 5
+NEWS_WORDS = 150
+COMMENT_WORDS = 20
+# Разброс длины текстов: sigma логнормального распределения.
+LENGTH_SIGMA = 0.6
+# Среднее время от публикации новости до комментария.
+COMMENT_DELAY = timedelta(days=1)
+
+
+def bulk_insert(model, objects, with_pk=False):
+    """
+    Вставляет объекты пачками, как bulk_create, но без pre_save полей.
+
+    id новым объектам не присваиваются. with_pk — вставлять и заданные
+    в объектах id, как в фикстурах.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if with_pk or not field.primary_key
+    ]
+    batch_size = max(connection.ops.bulk_batch_size(fields, objects), 1)
+    for start in range(0, len(objects), batch_size):
+        model._base_manager._insert(
+            objects[start:start + batch_size], fields=fields, raw=True
+        )
+
+
+def insert_rows(model, field_names, rows):
+    """
+    Вставляет строки значений полей field_names одним executemany.
+
+    Значения должны быть уже подготовлены для БД, как после
+    get_db_prep_save.
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(model._meta.get_field(name).column) for name in field_names
+    )
+    placeholders = ', '.join(['%s'] * len(field_names))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {quote(model._meta.db_table)} ({columns}) '
+            f'VALUES ({placeholders})',
+            rows,
+        )
+
+
+@contextlib.contextmanager
+def indexes_rebuilt(model):
+    """
+    На время массовой вставки убирает вторичные индексы таблицы model.
+
+    Построить индекс по заполненной таблице быстрее, чем обновлять его
+    на каждой вставленной строке. Только для SQLite и только внутри
+    транзакции: при ошибке откат вернёт индексы на место.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            'AND tbl_name = %s AND sql IS NOT NULL',
+            [model._meta.db_table],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    yield
+    with connection.cursor() as cursor:
+        for _, sql in indexes:
+            cursor.execute(sql)
+
+
+def max_pk(model):
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def pks_after(model, last):
+    """id объектов, добавленных после объекта с id last."""
+    return list(model.objects.filter(pk__gt=last).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+
+
+def zipf_cum_weights(size):
+    """Популярность слов, новостей и авторов примерно следует закону Ципфа."""
+    return list(itertools.accumulate(
+        1 / rank for rank in range(1, size + 1)
+    ))
+
+
+class TextGenerator:
+    """Тексты из случайных слов с частотами по закону Ципфа."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.words = [
+            ''.join(rng.choices(ALPHABET, k=rng.randint(2, 10)))
+            for _ in range(VOCABULARY_SIZE)
+        ]
+        self.weights = zipf_cum_weights(VOCABULARY_SIZE)
+
+    def text(self, mean_words):
+        """Длина в словах распределена логнормально со средним mean_words."""
+        mu = math.log(mean_words) - LENGTH_SIGMA ** 2 / 2
+        count = max(1, round(self.rng.lognormvariate(mu, LENGTH_SIGMA)))
+        return ' '.join(self.rng.choices(
+            self.words, cum_weights=self.weights, k=count
+        ))
+
+
+def create_users(count):
+    User = get_user_model()
+    last = max_pk(User)
+    # Войти под этими пользователями нельзя, хэшировать пароль незачем.
+    password = make_password(None)
+    for start in range(0, count, SEED_CHUNK):
+        bulk_insert(User, [
+            User(username=f'reader{last + number + 1}', password=password)
+            for number in range(start, min(start + SEED_CHUNK, count))
+        ])
+    return pks_after(User, last)
+
+
+def create_news(count, days, texts):
+    """
+    Новости за последние days дней, свежих больше, чем старых.
+
+    Возвращает пары (id, время публикации) от самой свежей новости.
+    """
+    rng = texts.rng
+    last = max_pk(News)
+    today = date.today()
+    for start in range(0, count, SEED_CHUNK):
+        bulk_insert(News, [
+            News(
+                title=texts.text(TITLE_WORDS)[:50],
+                text=texts.text(NEWS_WORDS),
+                date=today - timedelta(days=int(rng.triangular(0, days, 0))),
+            )
+            for _ in range(start, min(start + SEED_CHUNK, count))
+        ])
+    published = News.objects.filter(pk__gt=last).order_by(
+        '-date', 'pk'
+    ).values_list('pk', 'date')
+    return [
+        (pk, timezone.make_aware(datetime.combine(day, time.min)))
+        for pk, day in published
+    ]
+
+
+def create_comments(count, news, author_ids, texts):
+    """
+    Комментарии к news: свежие новости и активные авторы популярнее.
+
+    Комментарий появляется в среднем через COMMENT_DELAY после новости,
+    но не позже текущего момента.
+    """
+    rng = texts.rng
+    pool = [texts.text(COMMENT_WORDS) for _ in range(COMMENT_TEXT_POOL)]
+    news_weights = zipf_cum_weights(len(news))
+    author_weights = zipf_cum_weights(len(author_ids))
+    # Время переводим в часовой пояс БД заранее: так подготовка значения
+    # для БД не пересчитывает пояс для каждого комментария.
+    db_timezone = connection.timezone
+    news = [
+        (pk, timezone.make_naive(published, db_timezone))
+        for pk, published in news
+    ]
+    now = timezone.make_naive(timezone.now(), db_timezone)
+    rate = 1 / COMMENT_DELAY.total_seconds()
+    adapt = connection.ops.adapt_datetimefield_value
+    for start in range(0, count, SEED_CHUNK):
+        size = min(SEED_CHUNK, count - start)
+        targets = rng.choices(news, cum_weights=news_weights, k=size)
+        authors = rng.choices(
+            author_ids, cum_weights=author_weights, k=size
+        )
+        insert_rows(
+            Comment, ('news', 'author', 'text', 'created', 'is_flagged'), [
+                (news_id, author_id, rng.choice(pool), adapt(min(
+                    now, published + timedelta(seconds=rng.expovariate(rate))
+                )), False)
+                for (news_id, published), author_id in zip(targets, authors)
+            ]
+        )
+
+
+def generate(news, users, comments, days=365, seed=0):
+    """
+    Создаёт news новостей, users пользователей и comments комментариев.
+
+    Всё пишется в одной транзакции; seed делает данные воспроизводимыми.
+    """
+    if comments and not (news and users):
+        raise ValueError('Комментариям нужны новости и пользователи.')
+    texts = TextGenerator(random.Random(seed))
+    with transaction.atomic():
+        author_ids = create_users(users)
+        published = create_news(news, days, texts)
+        if comments:
+            with indexes_rebuilt(Comment):
+                create_comments(comments, published, author_ids, texts)
+            News.objects.update(
+                comment_count=comment_count_subquery(), version=new_version()
+            )
+
+
+def load_fixture(path):
+    """
+    Загружает фикстуру JSON, вставляя объекты пачками по моделям.
+
+    В отличие от loaddata, объекты только добавляются: объект с уже
+    занятым id вызовет IntegrityError. Объекты со связями многие ко
+    многим сохраняются по одному, как в loaddata. Возвращает число
+    загруженных объектов.
+    """
+    loaded = 0
+    batches = defaultdict(list)
+
+    def flush(key):
+        model, with_pk = key
+        bulk_insert(model, batches.pop(key), with_pk)
+
+    with open(path, encoding='utf-8') as file, transaction.atomic():
+        for deserialized in serializers.deserialize('json', file):
+            loaded += 1
+            if deserialized.m2m_data:
+                deserialized.save()
+                continue
+            instance = deserialized.object
+            key = (type(instance), instance.pk is not None)
+            batches[key].append(instance)
+            if len(batches[key]) >= SEED_CHUNK:
+                flush(key)
+        for key in list(batches):
+            flush(key)
+        News.objects.update(
+            comment_count=comment_count_subquery(), version=new_version()
+        )
+    return loaded
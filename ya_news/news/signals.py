@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Comment, News, discount_comments, new_version
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличиваем счётчик комментариев новости при создании комментария."""
+    if created and not raw:
+        News.objects.filter(pk=instance.news_id).update(
+            comment_count=F('comment_count') + 1, version=new_version()
+        )
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def discount_author_comments(sender, instance, **kwargs):
+    """
+    Вычитаем комментарии удаляемого пользователя из счётчиков новостей.
+
+    Комментарии удаляются каскадом одним DELETE без сигналов (см.
+    CommentQuerySet.delete), поэтому счётчики всех новостей автора
+    поправляем заранее одним UPDATE. Каскад от удаляемой новости
+    ничего не поправляет: её счётчик удаляется вместе с ней.
+    """
+    discount_comments(Comment.objects.filter(author=instance))
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_news_cache_on_comment(sender, instance, created, raw=False,
+                                     **kwargs):
+    """Правка комментария меняет кэшированную страницу новости."""
+    if not created and not raw:
+        News.objects.filter(pk=instance.news_id).update(version=new_version())
+
+
+@receiver(pre_save, sender=News)
+def invalidate_news_cache(sender, instance, **kwargs):
+    """
+    Правка новости, например в админке, тоже сбрасывает её кэш.
+
+    Версия меняется и при загрузке фикстуры (raw): loaddata может
+    перезаписать уже закэшированную новость.
+    """
+    instance.version = new_version()
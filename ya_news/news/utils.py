@@ -0,0 +1,150 @@
+import base64
+import binascii
+import calendar
+import hashlib
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import (BigIntegerField, Count, IntegerField, OuterRef,
+                              Q, Subquery)
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
+from django.utils.http import quote_etag
+
+from .models import Comment, News
+
+
+def comment_count_subquery():
+    """Подзапрос с фактическим числом комментариев для каждой новости."""
+    counts = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def encode_position(value, pk):
+    """Курсор из значения ключа сортировки (дата или время) и id."""
+    raw = f'{value.isoformat()},{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def encode_cursor(comment):
+    """Курсор — позиция комментария в порядке (created, id)."""
+    return encode_position(comment.created, comment.pk)
+
+
+def decode_cursor(cursor):
+    """
+    Разбирает курсор; при любой ошибке формата бросает ValueError.
+
+    id вне диапазона BigIntegerField тоже ошибка формата: иначе драйвер
+    БД бросил бы OverflowError уже при выполнении запроса.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created, pk = raw.rsplit(',', 1)
+        created, pk = datetime.fromisoformat(created), int(pk)
+    except (binascii.Error, UnicodeError) as error:
+        raise ValueError(str(error)) from error
+    if not 0 <= pk <= BigIntegerField.MAX_BIGINT:
+        raise ValueError(f'id вне допустимого диапазона: {pk}')
+    return created, pk
+
+
+def comment_page_queryset(news_id, cursor=None, page_size=None):
+    """
+    Запрос страницы комментариев новости после курсора.
+
+    Пагинация по ключу (created, id): вместо OFFSET запрос начинается
+    сразу после последнего показанного комментария, поэтому стоимость
+    любой страницы одинакова, как бы глубоко ни листал читатель.
+    Берём на один комментарий больше, чтобы узнать о следующей странице.
+    """
+    if page_size is None:
+        page_size = settings.COMMENTS_PAGE_SIZE
+    queryset = Comment.objects.filter(news_id=news_id).select_related(
+        'author'
+    ).only('text', 'created', 'news_id', 'author__username')
+    if cursor is not None:
+        created, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    return queryset.order_by(*Comment._meta.ordering)[:page_size + 1]
+
+
+def get_comment_page(news_id, cursor=None):
+    """Возвращает страницу комментариев и курсор следующей страницы."""
+    page_size = settings.COMMENTS_PAGE_SIZE
+    comments = list(comment_page_queryset(news_id, cursor, page_size))
+    next_cursor = None
+    if len(comments) > page_size:
+        comments = comments[:page_size]
+        next_cursor = encode_cursor(comments[-1])
+    return comments, next_cursor
+
+
+class LazyCommentPage:
+    """
+    Страница комментариев, которая читается из БД при первом обращении.
+
+    Если шаблон взял фрагмент из кэша, запрос к комментариям не выполняется.
+    """
+
+    def __init__(self, news_id, cursor=None):
+        self.news_id = news_id
+        self.cursor = cursor
+
+    @cached_property
+    def _page(self):
+        return get_comment_page(self.news_id, self.cursor)
+
+    @property
+    def comments(self):
+        return self._page[0]
+
+    @property
+    def next_cursor(self):
+        return self._page[1]
+
+
+def home_page_validators(user):
+    """
+    ETag и Last-Modified главной страницы для пользователя user.
+
+    Всё, что показывает лента, лежит в строках её новостей: состав ленты,
+    даты, счётчики комментариев и News.version, которую меняет любая
+    правка новости. ETag строится из этих строк одним запросом по индексу
+    даты. Данные берутся из БД, поэтому все процессы отдают одинаковый
+    ETag. В шапке выводится имя пользователя, поэтому ETag у каждого свой.
+    """
+    rows = list(News.objects.values_list(
+        'pk', 'date', 'version', 'comment_count'
+    )[:settings.NEWS_COUNT_ON_HOME_PAGE])
+    last_modified = max((
+        max(calendar.timegm(date.timetuple()), version // 10 ** 9)
+        for _, date, version, _ in rows
+    ), default=0)
+    digest = hashlib.md5(repr(rows).encode()).hexdigest()
+    etag = quote_etag(f'{digest}-{user.pk or 0}')
+    return etag, last_modified
+
+
+def db_sync_to_async(func):
+    """
+    Синхронный код с запросами к БД для асинхронного представления.
+
+    Код выполняется в пуле потоков без thread_sensitive: под ASGI запросы
+    разных клиентов идут параллельно, а не по очереди в одном общем
+    потоке. Соединения потока закрываются по тем же правилам, что и в
+    начале и конце обычного запроса (CONN_MAX_AGE).
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
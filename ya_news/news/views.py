@@ -1,11 +1,21 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.core.exceptions import BadRequest
+from django.db.models import BigIntegerField
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.template.response import SimpleTemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from django.views import generic
 
 from .forms import CommentForm
 from .models import Comment, News
+from .search import search_news
+from .utils import (LazyCommentPage, db_sync_to_async, decode_cursor,
+                    home_page_validators)
 
 
 class NewsList(generic.ListView):
@@ -18,22 +28,85 @@ class NewsList(generic.ListView):
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Число комментариев берётся из денормализованного поля
+        comment_count, поэтому сами комментарии не загружаются.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Условный GET: если лента не менялась, отвечаем 304 без отрисовки.
+
+        Страница зависит от того, кто вошёл, поэтому ответ всегда
+        помечается Vary: Cookie — общий кэш не отдаст страницу анонима
+        авторизованному пользователю и наоборот.
+        """
+        etag, last_modified = home_page_validators(request.user)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.get_page(request, etag, *args, **kwargs)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def get_page(self, request, etag, *args, **kwargs):
+        """
+        Страница целиком, для анонимов — из кэша, если он включён.
+
+        ETag меняется вместе с лентой, поэтому служит ключом кэша:
+        старые версии страницы просто перестают запрашиваться.
+        """
+        timeout = settings.NEWS_HOME_PAGE_CACHE_TIMEOUT
+        if timeout is None or request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = f'news:home-page:{etag}'
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs).render()
+        cache.set(key, response.content, timeout)
+        return response
+
+
+class NewsSearch(generic.ListView):
+    """Поиск по заголовкам и текстам новостей."""
+    template_name = 'news/search.html'
+
+    def get_paginate_by(self, queryset):
+        return settings.NEWS_SEARCH_PAGE_SIZE
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_news(self.query)
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.query, **kwargs)
+
+
+class FirstCommentPageMixin:
+    """
+    На странице новости показываем только первую страницу комментариев.
+
+    Для анонимных читателей статья с комментариями кэшируется целиком,
+    ключ фрагмента включает News.version, которую меняют сигналы.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comment_page'] = LazyCommentPage(self.object.pk)
+        context['cache_timeout'] = settings.NEWS_DETAIL_CACHE_TIMEOUT
+        return context
 
 
-class NewsDetail(generic.DetailView):
+class NewsDetail(FirstCommentPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -44,6 +117,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        FirstCommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -63,8 +137,9 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
@@ -78,19 +153,81 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+def as_async_view(view_class):
+    """
+    Асинхронная версия представления-класса для запуска под ASGI.
+
+    ORM и шаблоны Django синхронные, и для синхронного представления
+    ASGI-обработчик выполняет их в одном общем потоке — клиенты ждут друг
+    друга. Здесь представление вместе с отрисовкой шаблона выполняется в
+    пуле потоков, см. db_sync_to_async. Django 3.2 не поддерживает
+    асинхронные методы у представлений-классов, поэтому это функция.
+    """
+    view = view_class.as_view()
+
+    async def async_view(request, *args, **kwargs):
+        def respond():
+            response = view(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+            return response
+        return await db_sync_to_async(respond)()
+    async_view.view_class = view_class
+    return async_view
+
+
+news_list_async = as_async_view(NewsList)
+news_detail_async = as_async_view(NewsDetailView)
+
+
+class CommentPage(generic.TemplateView):
+    """Фрагмент со следующей страницей комментариев к новости."""
+    template_name = 'news/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        news_pk = self.kwargs['pk']
+        if news_pk > BigIntegerField.MAX_BIGINT:
+            raise Http404('Новость не найдена.')
+        cursor = self.request.GET.get('cursor')
+        if cursor is not None:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                raise BadRequest('Некорректный курсор.')
+        comment_page = LazyCommentPage(news_pk, cursor)
+        # Пустая страница бывает и у новости без комментариев, и у
+        # несуществующей: только в этом случае проверяем новость запросом.
+        if (not comment_page.comments
+                and not News.objects.filter(pk=news_pk).exists()):
+            raise Http404('Новость не найдена.')
+        context.update(
+            news_pk=news_pk,
+            comment_page=comment_page,
+            cursor=cursor,
+        )
+        return context
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Комментарий уже загружен в self.object, news_id берём из него."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
-        """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими комментариями.
+
+        Новость подгружаем сразу: её заголовок выводится в шаблонах.
+        """
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Общий код проектов — пакет yacommon в корне репозитория.
+ROOT_DIR = str(Path(__file__).resolve().parents[2])
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым: замеряет всю цепочку, см. yacommon.request_stats.
+    'yacommon.request_stats.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,6 +51,20 @@ TEMPLATES = [
     },
 ]
 
+# Профиль шаблонов для продакшена включается переменной окружения
+# TEMPLATES_PROFILE=production: скомпилированные шаблоны хранятся в памяти
+# процесса, а при запуске (wsgi.py, asgi.py) заранее компилируются все
+# шаблоны из templates/.
+TEMPLATES_WARM_UP = os.environ.get('TEMPLATES_PROFILE') == 'production'
+if TEMPLATES_WARM_UP:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    )]
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -58,6 +75,55 @@ DATABASES = {
     }
 }
 
+# Файл тестовой БД: parallel_tests.py даёт каждому процессу pytest
+# свою копию заранее подготовленной БД.
+if os.environ.get('TEST_DB_NAME'):
+    DATABASES['default']['TEST'] = {'NAME': os.environ['TEST_DB_NAME']}
+
+
+# Профиль БД для продакшена включается переменной окружения
+# DB_PROFILE=production: журнал WAL (чтение не ждёт записи), отображение
+# файла в память, больший кэш страниц, ожидание блокировок вместо ошибки
+# и постоянные соединения вместо нового на каждый запрос.
+if os.environ.get('DB_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'ENGINE': 'yacommon.backends.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'mmap_size': 256 * 2 ** 20,
+                'cache_size': -64 * 1024,
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+
+# В кэше лежат только данные с версией из БД в ключе (News.version),
+# поэтому кэш каждого процесса остаётся верным и без общего хранилища:
+# общий бэкенд (Memcached, Redis) лишь экономит память и прогрев.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+# Профиль сессий включается переменной окружения SESSION_PROFILE:
+# cached_db — сессии читаются из кэша и записываются в БД,
+# signed_cookies — хранятся в подписанной cookie (клиент видит их
+# содержимое, но не может подделать). В обоих профилях пользователь
+# сессии USER_CACHE_TIMEOUT секунд берётся из кэша процесса
+# (yacommon.auth_backends). Смена профиля разлогинивает всех.
+SESSION_PROFILE = os.environ.get('SESSION_PROFILE')
+USER_CACHE_TIMEOUT = 0
+if SESSION_PROFILE in ('cached_db', 'signed_cookies'):
+    SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_PROFILE}'
+    AUTHENTICATION_BACKENDS = ['yacommon.auth_backends.CachedUserBackend']
+    USER_CACHE_TIMEOUT = 30
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +146,26 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+COMMENTS_PAGE_SIZE = 20
+NEWS_SEARCH_PAGE_SIZE = 10
+NEWS_DETAIL_CACHE_TIMEOUT = 60 * 60
+# Время хранения главной страницы для анонимов в кэше, в секундах.
+# None — не кэшировать, страница отрисовывается на каждый запрос.
+NEWS_HOME_PAGE_CACHE_TIMEOUT = None
+# Асинхронные версии ленты и страницы новости для запуска под ASGI:
+# NEWS_ASYNC_VIEWS=1. По умолчанию используются синхронные.
+NEWS_ASYNC_VIEWS = os.environ.get('NEWS_ASYNC_VIEWS') == '1'
+# Размер страницы JSON API по умолчанию и наибольший допустимый (?limit=).
+NEWS_API_PAGE_SIZE = 20
+NEWS_API_MAX_PAGE_SIZE = 500
+
+# Файл со списком запрещённых слов, по одному в строке.
+# Если не задан, используется news.moderation.BAD_WORDS.
+BAD_WORDS_FILE = None
+
+# Статистика запросов по представлениям (yacommon.request_stats):
+# REQUEST_STATS=1. Выключенный middleware не участвует в обработке.
+REQUEST_STATS = os.environ.get('REQUEST_STATS') == '1'
+# Файл, куда статистика пишется при завершении процесса; {pid} в имени
+# заменяется номером процесса. None — не записывать.
+REQUEST_STATS_FILE = os.environ.get('REQUEST_STATS_FILE')
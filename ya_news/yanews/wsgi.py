@@ -11,6 +11,14 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from news.moderation import get_matcher
+from yacommon.warmup import warm_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
 application = get_wsgi_application()
+
+warm_templates()
+# Список запрещённых слов собирается здесь, а не при первом комментарии
+# в каждом процессе: для большого BAD_WORDS_FILE это секунды.
+get_matcher()
@@ -0,0 +1,92 @@
+"""
+Импорт заметок: пакетное API против формы на каждую заметку.
+
+По --notes заметок (каждый десятый заголовок повторяется, чтобы
+подбирались суффиксы slug) загружаются через POST формы
+notes:add по одной и через notes:api-add пакетами по --batch.
+Выводятся общее время, число запросов к БД и скорость.
+"""
+import argparse
+import json
+import time
+
+from . import setup_django, test_database
+
+
+def make_notes(count, prefix):
+    return [
+        {'title': f'{prefix} {number // 10 if number % 10 == 0 else number}',
+         'text': 'Текст заметки. ' * 20}
+        for number in range(count)
+    ]
+
+
+def import_with_forms(client, notes):
+    from django.urls import reverse
+
+    url = reverse('notes:add')
+    for note in notes:
+        response = client.post(url, note)
+        assert response.status_code == 302, response.status_code
+
+
+def import_with_api(client, notes, batch):
+    from django.urls import reverse
+
+    url = reverse('notes:api-add')
+    for start in range(0, len(notes), batch):
+        response = client.post(
+            url, json.dumps({'notes': notes[start:start + batch]}),
+            content_type='application/json',
+        )
+        assert response.status_code == 200, response.content
+
+
+class QueryCounter:
+    """Считает запросы к БД; журнал запросов для этого не годится."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=10_000)
+    parser.add_argument('--batch', type=int, default=1_000)
+    args = parser.parse_args()
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+
+    from notes.models import Note
+
+    with test_database():
+        cases = (
+            ('формы', import_with_forms, ()),
+            (f'API по {args.batch}', import_with_api, (args.batch,)),
+        )
+        print(f'Заметок: {args.notes}')
+        for number, (name, run, extra) in enumerate(cases):
+            user = get_user_model().objects.create(username=f'user-{number}')
+            client = Client()
+            client.force_login(user)
+            # Свои заголовки у каждого способа: иначе второму достались бы
+            # slug, уже занятые первым.
+            notes = make_notes(args.notes, f'Заметка {number}')
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                run(client, notes, *extra)
+                elapsed = time.perf_counter() - start
+            assert Note.objects.filter(author=user).count() == args.notes
+            print(f'{name:>12}: {elapsed:6.1f} с, запросов {counter.count}, '
+                  f'{args.notes / elapsed:7.0f} заметок/с')
+
+
+if __name__ == '__main__':
+    main()
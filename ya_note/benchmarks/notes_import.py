@@ -0,0 +1,109 @@
+"""
+Импорт заметок из файла: notes.importer против NoteForm на каждую заметку.
+
+Для каждого способа --notes заметок (каждый десятый заголовок
+повторяется, чтобы подбирались суффиксы slug) пишутся во временный
+файл NDJSON или ZIP и импортируются новому пользователю. Скорость
+замеряется без tracemalloc, пик памяти — отдельным прогоном с ним.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from . import setup_django, test_database
+
+
+def make_items(count, prefix):
+    for number in range(count):
+        title = f'{prefix} {number // 10 if number % 10 == 0 else number}'
+        yield {'title': title, 'text': 'Текст заметки. ' * 20}
+
+
+def write_file(path, items):
+    from notes.export import ZipStream, markdown
+
+    with open(path, 'wb') as file:
+        if not path.endswith('.zip'):
+            for item in items:
+                file.write(json.dumps(item, ensure_ascii=False).encode())
+                file.write(b'\n')
+            return
+        archive = ZipStream()
+        for number, item in enumerate(items):
+            # Без slug в имени файла: slug подбираются по заголовкам.
+            file.write(archive.add(
+                f'Заметка {number}.md',
+                markdown(item['title'], item['text']).encode(),
+            ))
+        file.writelines(archive.finish())
+
+
+def import_with_forms(author, path):
+    from notes.forms import NoteForm
+    from notes.importer import read_items
+
+    with open(path, 'rb') as file:
+        for item in read_items(file, path):
+            form = NoteForm(data=item)
+            assert form.is_valid(), form.errors
+            note = form.save(commit=False)
+            note.author = author
+            note.save()
+
+
+def import_with_importer(author, path):
+    from notes.importer import import_notes, read_items
+
+    with open(path, 'rb') as file:
+        imported, errors = import_notes(author, read_items(file, path))
+    assert not errors, errors
+
+
+def run(case, args, directory, trace):
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    name, extension, function = case
+    prefix = f'{name} {"память" if trace else "скорость"}'
+    path = os.path.join(directory, f'notes{extension}')
+    write_file(path, make_items(args.notes, prefix))
+    author = get_user_model().objects.create(username=prefix)
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        function(author, path)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else None
+    finally:
+        tracemalloc.stop()
+    assert Note.objects.filter(author=author).count() == args.notes
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=20_000)
+    args = parser.parse_args()
+    setup_django()
+
+    cases = (
+        ('NoteForm', '.ndjson', import_with_forms),
+        ('NDJSON', '.ndjson', import_with_importer),
+        ('ZIP', '.zip', import_with_importer),
+    )
+    print(f'Заметок: {args.notes}')
+    with test_database(), tempfile.TemporaryDirectory() as directory:
+        for case in cases:
+            elapsed, _ = run(case, args, directory, trace=False)
+            _, peak = run(case, args, directory, trace=True)
+            print(f'{case[0]:>8}: {args.notes / elapsed:6.0f} заметок/с, '
+                  f'пик памяти {peak / 1024 / 1024:5.1f} МиБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Список заметок: весь список целиком против постраничного NotesList.
+
+Для пользователей с 10, 10 000 и 100 000 заметок замеряются число
+запросов, размер ответа, время и пиковая память на рендер.
+"""
+import argparse
+import tracemalloc
+
+from . import measure, percentile, setup_django, test_database
+
+SIZES = (10, 10_000, 100_000)
+
+
+def create_user_with_notes(index, count):
+    from django.contrib.auth import get_user_model
+    from notes.models import Note
+
+    user = get_user_model().objects.create(username=f'user-{index}')
+    text = 'Текст заметки. ' * 40
+    Note.objects.bulk_create(
+        (
+            Note(
+                title=f'Заметка {number}', text=text, author=user,
+                slug=f'user-{index}-note-{number}'
+            )
+            for number in range(count)
+        ),
+        batch_size=5000,
+    )
+    return user
+
+
+def run(render, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        size = len(render())
+    # Журнал запросов очищается в начале каждого запроса клиента,
+    # поэтому число запросов запоминаем сразу.
+    query_count = len(queries)
+    tracemalloc.start()
+    render()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings = measure(render, repeat)
+    return query_count, size, percentile(timings, 50), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=SIZES,
+        help='Сколько заметок у каждого пользователя.'
+    )
+    args = parser.parse_args()
+    setup_django()
+    from django.template.loader import render_to_string
+    from django.test import Client
+    from django.urls import reverse
+    from notes.models import Note
+
+    with test_database():
+        print(f'{"заметок":>8} {"режим":>10} {"запросов":>9} '
+              f'{"ответ, КБ":>10} {"p50, мс":>9} {"память, МБ":>11}')
+        for index, count in enumerate(args.sizes):
+            user = create_user_with_notes(index, count)
+            client = Client()
+            client.force_login(user)
+            url = reverse('notes:list')
+            modes = {
+                'весь': lambda: render_to_string('notes/list.html', {
+                    'object_list': Note.objects.filter(author=user),
+                    'user': user,
+                }),
+                'страница': lambda: client.get(url).content,
+            }
+            for mode, render in modes.items():
+                queries, size, p50, peak = run(render, args.repeat)
+                print(f'{count:>8} {mode:>10} {queries:>9} '
+                      f'{size / 1024:>10.1f} {p50 * 1000:>9.1f} '
+                      f'{peak / 2 ** 20:>11.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Поиск по заметкам: FTS5 против icontains.
+
+Создаёт --notes заметок у --users пользователей и замеряет p50/p99
+времени поиска одного пользователя по случайным словам из словаря.
+"""
+import argparse
+import itertools
+import random
+
+from . import measure, percentile, setup_django, test_database
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+VOCABULARY_SIZE = 50_000
+
+
+def make_vocabulary(rng):
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10)))
+        for _ in range(VOCABULARY_SIZE)
+    ]
+
+
+def zipf_cum_weights(size):
+    """Частоты слов в тексте примерно следуют закону Ципфа."""
+    return list(itertools.accumulate(
+        1 / rank for rank in range(1, size + 1)
+    ))
+
+
+def create_notes(count, users, words, rng):
+    from django.contrib.auth import get_user_model
+    from notes.models import Note
+
+    User = get_user_model()
+    authors = User.objects.bulk_create(
+        User(username=f'user-{index}') for index in range(users)
+    )
+    authors = list(User.objects.filter(
+        username__in=[author.username for author in authors]
+    ))
+    weights = zipf_cum_weights(len(words))
+    batch = []
+    for number in range(count):
+        batch.append(Note(
+            title=' '.join(rng.choices(words, cum_weights=weights, k=3)),
+            text=' '.join(rng.choices(
+                words, cum_weights=weights, k=rng.randint(20, 80)
+            )),
+            author=authors[number % users],
+            slug=f'note-{number}',
+        ))
+        if len(batch) == 10_000:
+            Note.objects.bulk_create(batch)
+            batch = []
+    Note.objects.bulk_create(batch)
+    return authors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    from django.test import override_settings
+    from notes.models import Note
+    from notes.search import search_notes
+
+    rng = random.Random(0)
+    words = make_vocabulary(rng)
+    with test_database():
+        authors = create_notes(args.notes, args.users, words, rng)
+        print(f'Заметок: {args.notes}, пользователей: {args.users}')
+        for fulltext in (True, False):
+            queries = iter([
+                ' '.join(rng.sample(words[:5000], rng.randint(1, 2)))
+                for _ in range(args.queries)
+            ])
+            author = rng.choice(authors)
+            queryset = Note.objects.filter(author=author)
+            repeat = args.queries if fulltext else max(args.queries // 20, 5)
+            with override_settings(NOTES_FULLTEXT_SEARCH=fulltext):
+                timings = measure(
+                    lambda: search_notes(queryset, next(queries), 100),
+                    repeat,
+                )
+            mode = 'FTS5' if fulltext else 'icontains'
+            print(f'{mode:>10}: p50 {percentile(timings, 50) * 1000:.1f} мс, '
+                  f'p99 {percentile(timings, 99) * 1000:.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
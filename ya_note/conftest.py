@@ -0,0 +1 @@
+from yacommon.testing import fast_password_hasher  # noqa: F401
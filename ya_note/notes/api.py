@@ -0,0 +1,118 @@
+"""
+JSON API для пакетной работы с заметками.
+
+Все запросы — POST с JSON от вошедшего пользователя (нужен и
+CSRF-токен в заголовке X-CSRFToken, как для форм):
+
+* add/ — {"notes": [{"title": ..., "text": ..., "slug": ...}, ...]};
+* edit/ — {"notes": [{"id": ..., "title": ...}, ...]};
+* delete/ — {"ids": [...]}.
+
+Заметки проверяются как в NoteForm. Если хоть одна не прошла проверку,
+ответ 400 со списком ошибок по номерам элементов и ничего не записано.
+"""
+import json
+
+from django.conf import settings
+from django.db.models import BigAutoField
+from django.http import JsonResponse
+from django.views import generic
+
+from .bulk import create_notes, delete_notes, update_notes
+
+
+def is_id(value):
+    """Целое в диапазоне BigAutoField: большее драйвер БД не примет."""
+    return (
+        isinstance(value, int) and not isinstance(value, bool)
+        and 0 < value <= BigAutoField.MAX_BIGINT
+    )
+
+
+class NotesApiView(generic.View):
+    """Основа представлений API: разбор тела запроса и ответы с ошибками."""
+    http_method_names = ['post']
+    body_key = 'notes'
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Нужно войти.'}, status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            items = self.parse_body()
+        except ValueError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        result, errors = self.apply(items)
+        if errors:
+            return JsonResponse({'errors': [
+                {'index': index, 'errors': item_errors}
+                for index, item_errors in errors
+            ]}, status=400, json_dumps_params={'ensure_ascii': False})
+        return JsonResponse(result, json_dumps_params={'ensure_ascii': False})
+
+    def parse_body(self):
+        """Список из тела {"<body_key>": [...]}; ValueError, если его нет."""
+        try:
+            body = json.loads(self.request.body)
+        except ValueError:
+            raise ValueError('Тело запроса должно быть JSON.')
+        items = body.get(self.body_key) if isinstance(body, dict) else None
+        if not isinstance(items, list):
+            raise ValueError(f'Ожидается объект со списком «{self.body_key}».')
+        if len(items) > settings.NOTES_API_MAX_BATCH:
+            raise ValueError(
+                f'Не больше {settings.NOTES_API_MAX_BATCH} элементов за раз.'
+            )
+        self.validate_items(items)
+        return items
+
+    def validate_items(self, items):
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f'Элемент {index} должен быть объектом.')
+
+    def apply(self, items):
+        raise NotImplementedError
+
+    def notes_result(self, notes):
+        return {'notes': [
+            {'id': note.pk, 'slug': note.slug} for note in notes
+        ]}
+
+
+class NotesCreateApi(NotesApiView):
+    """Создание заметок пакетом."""
+
+    def apply(self, items):
+        notes, errors = create_notes(self.request.user, items)
+        return self.notes_result(notes), errors
+
+
+class NotesUpdateApi(NotesApiView):
+    """Изменение заметок пакетом."""
+
+    def validate_items(self, items):
+        super().validate_items(items)
+        for index, item in enumerate(items):
+            if not is_id(item.get('id')):
+                raise ValueError(f'У элемента {index} нет числового id.')
+
+    def apply(self, items):
+        notes, errors = update_notes(self.request.user, items)
+        return self.notes_result(notes), errors
+
+
+class NotesDeleteApi(NotesApiView):
+    """Удаление заметок пакетом."""
+    body_key = 'ids'
+
+    def validate_items(self, items):
+        for index, item in enumerate(items):
+            if not is_id(item):
+                raise ValueError(f'Элемент {index} должен быть числом.')
+
+    def apply(self, items):
+        deleted, errors = delete_notes(self.request.user, items)
+        return {'deleted': deleted}, errors
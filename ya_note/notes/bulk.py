@@ -0,0 +1,234 @@
+"""
+Пакетное создание, изменение и удаление заметок.
+
+Каждая заметка проверяется так же, как в NoteForm, но к БД обращаемся
+сразу за весь пакет: занятые slug читаются несколькими запросами,
+свободные подбираются в памяти, а запись идёт через bulk_create или
+bulk_update в одной транзакции. Если хоть одна заметка не прошла
+проверку, не записывается ни одна.
+
+Ошибки возвращаются списком пар (номер элемента, {поле: [сообщения]}).
+"""
+import functools
+import itertools
+import operator
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+
+from .forms import WARNING, NoteForm
+from .models import (SLUG_ATTEMPTS, Note, first_free_slug,
+                     slug_prefix_range, slug_stem)
+
+# Сколько значений передаём в один запрос slug__in или pk__in.
+QUERY_CHUNK = 500
+# Сколько диапазонов префиксов slug объединяем через OR в одном запросе.
+PREFIX_CHUNK = 200
+NOT_FOUND = 'Заметка не найдена.'
+REPEATED = 'Заметка повторяется в пакете.'
+
+
+class BatchNoteForm(NoteForm):
+    """
+    NoteForm без запросов к БД.
+
+    Уникальность slug проверяется сразу для всего пакета в check_slugs.
+    """
+
+    def clean_slug(self):
+        return self.cleaned_data.get('slug')
+
+    def validate_unique(self):
+        pass
+
+
+def chunks(values, size=QUERY_CHUNK):
+    """Списки по size значений; values читается по мере надобности."""
+    values = iter(values)
+    chunk = list(itertools.islice(values, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(values, size))
+
+
+def slug_owners(slugs):
+    """Словарь slug -> id заметки для занятых slug из slugs."""
+    owners = {}
+    for chunk in chunks(set(slugs)):
+        owners.update(
+            Note.objects.filter(slug__in=chunk).values_list('slug', 'pk')
+        )
+    return owners
+
+
+def form_errors(form):
+    return {field: list(errors) for field, errors in form.errors.items()}
+
+
+def check_slugs(forms):
+    """
+    Явно указанный slug не должен принадлежать другой заметке в БД и
+    повторяться в пакете.
+    """
+    valid = [
+        form for form in forms
+        if form.is_valid() and form.cleaned_data['slug']
+    ]
+    owners = slug_owners(form.cleaned_data['slug'] for form in valid)
+    seen = set()
+    for form in valid:
+        slug = form.cleaned_data['slug']
+        owner = owners.get(slug, form.instance.pk)
+        if owner != form.instance.pk or slug in seen:
+            form.add_error('slug', slug + WARNING)
+        seen.add(slug)
+
+
+def allocate_slugs(notes, reserved, stems=None):
+    """
+    Подбирает slug заметкам notes по заголовкам.
+
+    Сначала пачками проверяем сами основы slug — обычно они свободны.
+    Только для занятых или повторяющихся основ читаем диапазоны префиксов,
+    как Note.allocate_slug, но сразу для многих основ одним запросом.
+    reserved — slug, уже выбранные в пакете; stems — основы вместо
+    выведенных из заголовков.
+    """
+    if stems is None:
+        stems = [slug_stem(note.title) for note in notes]
+    owners = slug_owners(stems)
+    counts = Counter(stems)
+    crowded = (
+        stem for stem in counts
+        if counts[stem] > 1 or stem in owners or stem in reserved
+    )
+    taken = {}
+    for chunk in chunks(crowded, PREFIX_CHUNK):
+        taken.update(Note.objects.filter(
+            functools.reduce(operator.or_, map(slug_prefix_range, chunk))
+        ).values_list('slug', 'pk'))
+    reserved = set(reserved)
+    numbers = defaultdict(lambda: itertools.count(2))
+    for note, stem in zip(notes, stems):
+        def is_free(slug, pk=note.pk):
+            return slug not in reserved and taken.get(slug, pk) == pk
+        note.slug = first_free_slug(stem, is_free, numbers[stem])
+        reserved.add(note.slug)
+
+
+def save_forms(forms, write, errors=(), slugs_are_stems=False):
+    """
+    Проверяет формы и записывает заметки функцией write в транзакции.
+
+    Если slug успели занять параллельно, запись падает на уникальном
+    индексе; тогда проверяем и подбираем slug заново. slugs_are_stems —
+    указанный slug лишь основа, как выведенная из заголовка: занятый
+    получает суффикс «-2», «-3»... вместо ошибки.
+    """
+    errors = list(errors)
+    for _ in range(SLUG_ATTEMPTS):
+        if not slugs_are_stems:
+            check_slugs(form for form in forms if form is not None)
+        errors += [
+            (index, form_errors(form)) for index, form in enumerate(forms)
+            if form is not None and not form.is_valid()
+        ]
+        if errors:
+            return [], sorted(errors, key=lambda error: error[0])
+        notes = [form.instance for form in forms]
+        if slugs_are_stems:
+            allocate_slugs(notes, (), [
+                form.cleaned_data['slug'] or slug_stem(form.instance.title)
+                for form in forms
+            ])
+        else:
+            explicit = {
+                form.cleaned_data['slug'] for form in forms
+                if form.cleaned_data['slug']
+            }
+            allocate_slugs(
+                [form.instance for form in forms
+                 if not form.cleaned_data['slug']],
+                explicit,
+            )
+        try:
+            with transaction.atomic():
+                write(notes)
+        except IntegrityError:
+            continue
+        return notes, []
+    raise IntegrityError('Не удалось подобрать slug для пакета заметок.')
+
+
+def create_notes(author, items, with_ids=True, slugs_are_stems=False):
+    """
+    Создаёт заметки из словарей с полями NoteForm.
+
+    with_ids=False экономит запрос, если id новых заметок не нужны;
+    slugs_are_stems — см. save_forms.
+    """
+    forms = [BatchNoteForm(data=item) for item in items]
+    for form in forms:
+        form.instance.author = author
+    notes, errors = save_forms(
+        forms, Note.objects.bulk_create, slugs_are_stems=slugs_are_stems
+    )
+    if with_ids:
+        # bulk_create на SQLite не возвращает id, находим их по slug.
+        ids = slug_owners(note.slug for note in notes)
+        for note in notes:
+            note.pk = ids[note.slug]
+    return notes, errors
+
+
+def update_notes(author, items):
+    """
+    Изменяет заметки автора.
+
+    В каждом словаре id заметки и изменяемые поля; неуказанные поля
+    остаются прежними, как если бы форму отправили с текущими значениями.
+    """
+    ids = [item.get('id') for item in items]
+    existing = {}
+    for chunk in chunks(pk for pk in ids if isinstance(pk, int)):
+        existing.update(Note.objects.filter(author=author).in_bulk(chunk))
+    forms, errors = [], []
+    counts = Counter(ids)
+    for index, (pk, item) in enumerate(zip(ids, items)):
+        note = existing.get(pk)
+        if note is None or counts[pk] > 1:
+            errors.append((index, {'id': [NOT_FOUND if note is None
+                                          else REPEATED]}))
+            forms.append(None)
+            continue
+        data = {
+            field: item.get(field, getattr(note, field))
+            for field in NoteForm.Meta.fields
+        }
+        forms.append(BatchNoteForm(data=data, instance=note))
+
+    def write(notes):
+        Note.objects.bulk_update(notes, NoteForm.Meta.fields)
+
+    return save_forms(forms, write, errors)
+
+
+def delete_notes(author, ids):
+    """Удаляет заметки автора по списку id."""
+    found = set()
+    for chunk in chunks(pk for pk in ids if isinstance(pk, int)):
+        found.update(Note.objects.filter(
+            author=author, pk__in=chunk
+        ).values_list('pk', flat=True))
+    counts = Counter(ids)
+    errors = [
+        (index, {'id': [NOT_FOUND if pk not in found else REPEATED]})
+        for index, pk in enumerate(ids)
+        if pk not in found or counts[pk] > 1
+    ]
+    if errors:
+        return 0, errors
+    with transaction.atomic():
+        for chunk in chunks(found):
+            Note.objects.filter(pk__in=chunk).delete()
+    return len(found), []
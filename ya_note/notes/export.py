@@ -0,0 +1,168 @@
+"""
+Выгрузка заметок потоком: NDJSON или ZIP-архив с файлами «slug.md».
+
+Заметки читаются из БД итератором пачками, а результат отдаётся
+кусками по мере готовности, поэтому память не растёт с числом заметок.
+
+zipfile для этого не подходит: он держит в памяти описание каждого
+файла до конца архива. ZipStream пишет архив последовательно, а
+центральный каталог, который по формату идёт в конце, копит во
+временном файле: пока каталог мал, он в памяти, потом на диске.
+"""
+import json
+import struct
+import time
+import zlib
+from tempfile import SpooledTemporaryFile
+
+# Сколько заметок читаем из БД за раз.
+EXPORT_CHUNK = 2000
+# Размер кусков, которыми отдаётся ответ.
+STREAM_CHUNK = 64 * 1024
+# Сколько байт центрального каталога ZIP держим в памяти.
+DIRECTORY_IN_MEMORY = 1024 * 1024
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'zip': 'application/zip',
+}
+
+# Поля, которые больше не помещаются в обычный ZIP, пишутся в ZIP64.
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+# Бит 11: имена файлов в UTF-8.
+UTF8_FLAG = 0x0800
+
+# json.dumps с ensure_ascii=False создавал бы кодировщик на каждую заметку.
+ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def export_rows(queryset):
+    return queryset.order_by('id').values_list(
+        'slug', 'title', 'text'
+    ).iterator(chunk_size=EXPORT_CHUNK)
+
+
+def ndjson_parts(rows):
+    for slug, title, text in rows:
+        line = ENCODER.encode({'slug': slug, 'title': title, 'text': text})
+        yield f'{line}\n'.encode()
+
+
+def markdown(title, text):
+    return f'# {title}\n\n{text}\n'
+
+
+def zip_parts(rows):
+    archive = ZipStream()
+    for slug, title, text in rows:
+        yield archive.add(f'{slug}.md', markdown(title, text).encode())
+    yield from archive.finish()
+
+
+def buffered(parts, size=STREAM_CHUNK):
+    """Склеивает мелкие части в куски не меньше size байт."""
+    buffer = []
+    length = 0
+    for part in parts:
+        buffer.append(part)
+        length += len(part)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer.clear()
+            length = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def export_chunks(queryset, export_format):
+    """Куски байт выгрузки заметок queryset в формате из FORMATS."""
+    rows = export_rows(queryset)
+    parts = zip_parts(rows) if export_format == 'zip' else ndjson_parts(rows)
+    return buffered(parts)
+
+
+def dos_datetime(moment):
+    """Время и дата в формате MS-DOS, как их хранит ZIP."""
+    year, month, day, hour, minute, second = moment[:6]
+    return (
+        hour << 11 | minute << 5 | second // 2,
+        max(year - 1980, 0) << 9 | month << 5 | day,
+    )
+
+
+class ZipStream:
+    """
+    ZIP-архив, который пишется последовательно.
+
+    add возвращает байты очередного файла, finish — байты центрального
+    каталога и концевых записей. Содержимое каждого файла известно
+    целиком, поэтому размеры и CRC пишутся сразу в локальный заголовок.
+    """
+
+    def __init__(self, moment=None):
+        self.dos_time, self.dos_date = dos_datetime(
+            moment or time.localtime()
+        )
+        self.offset = 0
+        self.count = 0
+        self.directory = SpooledTemporaryFile(max_size=DIRECTORY_IN_MEMORY)
+
+    def add(self, name, data):
+        name = name.encode()
+        compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS
+        )
+        compressed = compressor.compress(data) + compressor.flush()
+        fields = (
+            UTF8_FLAG, 8, self.dos_time, self.dos_date,
+            zlib.crc32(data), len(compressed), len(data), len(name),
+        )
+        local = struct.pack(
+            '<IHHHHHIIIHH', 0x04034B50, ZIP_VERSION, *fields, 0
+        )
+        self.write_directory_record(name, fields)
+        self.offset += len(local) + len(name) + len(compressed)
+        self.count += 1
+        return local + name + compressed
+
+    def write_directory_record(self, name, fields):
+        offset = self.offset
+        extra = b''
+        if offset >= ZIP64_LIMIT:
+            extra = struct.pack('<HHQ', 1, 8, offset)
+            offset = ZIP64_LIMIT
+        version = ZIP64_VERSION if extra else ZIP_VERSION
+        self.directory.write(struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014B50, version, version, *fields,
+            len(extra), 0, 0, 0, 0, offset,
+        ))
+        self.directory.write(name)
+        self.directory.write(extra)
+
+    def finish(self):
+        """Центральный каталог и концевые записи архива."""
+        start, size = self.offset, self.directory.tell()
+        self.directory.seek(0)
+        while True:
+            part = self.directory.read(STREAM_CHUNK)
+            if not part:
+                break
+            yield part
+        self.directory.close()
+        end = start + size
+        count = self.count
+        if (count >= ZIP64_COUNT_LIMIT or start >= ZIP64_LIMIT
+                or size >= ZIP64_LIMIT):
+            yield struct.pack(
+                '<IQHHIIQQQQ', 0x06064B50, 44, ZIP64_VERSION,
+                ZIP64_VERSION, 0, 0, count, count, size, start,
+            )
+            yield struct.pack('<IIQI', 0x07064B50, 0, end, 1)
+            count = min(count, ZIP64_COUNT_LIMIT)
+            size, start = min(size, ZIP64_LIMIT), min(start, ZIP64_LIMIT)
+        yield struct.pack(
+            '<IHHHHIIH', 0x06054B50, 0, 0, count, count, size, start, 0
+        )
@@ -1,5 +1,3 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
@@ -16,14 +14,24 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
+        """
+        Обрабатывает случай, если указанный slug не уникален.
+
+        Пустой slug не проверяем: свободный вариант по заголовку
+        подберёт Note.save.
+        """
+        slug = self.cleaned_data.get('slug')
+        if slug and Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+
+class ImportForm(forms.Form):
+    """Файл с заметками для импорта."""
+    file = forms.FileField(
+        label='Файл',
+        help_text=('NDJSON с полями title, text и slug или ZIP-архив '
+                   'с файлами .md, как в выгрузке заметок'),
+    )
@@ -0,0 +1,131 @@
+"""
+Импорт заметок из файла: NDJSON или ZIP с файлами .md.
+
+Форматы те же, что у выгрузки (notes.export). Файл разбирается по мере
+чтения, а заметки создаются пачками через bulk.create_notes: проверка
+как в NoteForm, slug для всей пачки подбираются несколькими запросами,
+вставка — bulk_create.
+
+slug из файла (поле slug в NDJSON или имя файла .md) — только основа:
+занятый получает суффикс «-2», «-3»..., как выведенный из заголовка.
+Импорт идёт в одной транзакции: если хоть одна заметка не прошла
+проверку, не сохраняется ни одна.
+"""
+import json
+import posixpath
+import zipfile
+
+from django.core.validators import slug_re
+from django.db import transaction
+
+from .bulk import chunks, create_notes
+from .models import slug_max_length
+
+# Сколько заметок проверяем и вставляем за раз.
+IMPORT_CHUNK = 1000
+# Сколько ошибок показываем пользователю.
+ERRORS_SHOWN = 10
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+# Наибольший размер файла .md в архиве после распаковки, в байтах:
+# файл читается в память целиком.
+MAX_MARKDOWN_SIZE = 2 ** 20
+
+
+def ndjson_items(lines):
+    """Заметки из строк NDJSON; пустые строки пропускаются."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            raise ValueError(f'Строка {number}: некорректный JSON.')
+        if not isinstance(item, dict):
+            raise ValueError(f'Строка {number}: ожидается объект.')
+        yield item
+
+
+def markdown_item(name, content):
+    """
+    Заметка из файла Markdown.
+
+    Заголовок берём из первой строки вида «# Заголовок», иначе из имени
+    файла. Имя файла становится основой slug, если годится для него.
+    """
+    stem = posixpath.splitext(posixpath.basename(name))[0]
+    title, text = stem, content
+    first_line, _, rest = content.partition('\n')
+    if first_line.startswith('# '):
+        title, text = first_line[2:].strip(), rest
+    item = {'title': title, 'text': text}
+    if slug_re.match(stem):
+        item['slug'] = stem[:slug_max_length()]
+    return item
+
+
+def zip_items(file):
+    """Заметки из файлов .md в ZIP-архиве, по порядку в архиве."""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise ValueError('Файл не похож на ZIP-архив.')
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(
+                MARKDOWN_EXTENSIONS
+            ):
+                continue
+            if info.file_size > MAX_MARKDOWN_SIZE:
+                raise ValueError(
+                    f'{info.filename}: файл больше '
+                    f'{MAX_MARKDOWN_SIZE // 2 ** 20} МБ.'
+                )
+            try:
+                content = archive.read(info).decode()
+            except UnicodeDecodeError:
+                raise ValueError(f'{info.filename}: ожидается UTF-8.')
+            yield markdown_item(info.filename, content)
+
+
+def read_items(file, name):
+    """Заметки из файла: ZIP по расширению .zip, иначе NDJSON."""
+    if name.lower().endswith('.zip'):
+        return zip_items(file)
+    return ndjson_items(file)
+
+
+def import_notes(author, items, chunk_size=IMPORT_CHUNK):
+    """
+    Создаёт заметки автора из items пачками по chunk_size.
+
+    Возвращает число заметок и ошибки — пары (номер заметки в файле,
+    {поле: [сообщения]}). Ошибки разбора файла поднимаются как
+    ValueError. В обоих случаях ничего не сохраняется.
+    """
+    imported = 0
+    with transaction.atomic():
+        for chunk in chunks(items, chunk_size):
+            notes, errors = create_notes(
+                author, chunk, with_ids=False, slugs_are_stems=True
+            )
+            if errors:
+                transaction.set_rollback(True)
+                return 0, [
+                    (imported + index, item_errors)
+                    for index, item_errors in errors
+                ]
+            imported += len(notes)
+    return imported, []
+
+
+def describe_errors(errors, limit=ERRORS_SHOWN):
+    """Ошибки импорта строками «Заметка N, поле: сообщение»."""
+    lines = [
+        f'Заметка {index + 1}, {field}: {message}'
+        for index, item_errors in errors
+        for field, messages in item_errors.items()
+        for message in messages
+    ]
+    if len(lines) > limit:
+        lines[limit:] = [f'…и ещё ошибок: {len(lines) - limit}.']
+    return lines
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.export import FORMATS, export_chunks
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает заметки пользователя в файл NDJSON или ZIP с файлами '
+        'slug.md. Заметки читаются и пишутся потоком, память не растёт '
+        'с их числом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Чьи заметки выгружать.')
+        parser.add_argument('output', help='Куда записать выгрузку.')
+        parser.add_argument(
+            '--format', choices=tuple(FORMATS), default='ndjson',
+            help='Формат выгрузки (по умолчанию ndjson).'
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь «{options["username"]}» не найден.'
+            )
+        size = 0
+        with open(options['output'], 'wb') as file:
+            for chunk in export_chunks(
+                Note.objects.filter(author=author), options['format']
+            ):
+                file.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено в {options["output"]}: {size} байт'
+        ))
@@ -0,0 +1,44 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.importer import describe_errors, import_notes, read_items
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует заметки пользователю из файла NDJSON или ZIP с '
+        'файлами .md. Файл читается потоком, заметки создаются пачками '
+        'в одной транзакции: при ошибках не сохраняется ни одна.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Кому добавить заметки.')
+        parser.add_argument('path', help='Файл .ndjson или .zip.')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь «{options["username"]}» не найден.'
+            )
+        started = time.perf_counter()
+        with open(options['path'], 'rb') as file:
+            try:
+                imported, errors = import_notes(
+                    author, read_items(file, options['path'])
+                )
+            except ValueError as error:
+                raise CommandError(str(error))
+        if errors:
+            raise CommandError('\n'.join(
+                ['Заметки не импортированы:'] + describe_errors(errors)
+            ))
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: {imported}, {rate:.0f} заметок/с'
+        ))
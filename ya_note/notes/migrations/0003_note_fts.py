@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# Полнотекстовый индекс SQLite FTS5 поверх notes_note. Таблица хранит
+# только индекс (content='notes_note'), а триггеры поддерживают его при
+# любой записи, включая bulk_create и удаление каскадом.
+#
+# Внимание: при «пересоздании» notes_note (так SQLite выполняет многие
+# AlterField) таблица удаляется вместе с триггерами. Такие миграции
+# должны заново выполнить CREATE_TRIGGERS и перестроить индекс.
+CREATE_TABLE = """
+CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+    title, text,
+    content='notes_note', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+CREATE_TRIGGERS = (
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update AFTER UPDATE OF title, text
+    ON notes_note BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO notes_note_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+)
+REBUILD = "INSERT INTO notes_note_fts(notes_note_fts) VALUES ('rebuild')"
+DROP = (
+    'DROP TRIGGER IF EXISTS notes_note_fts_insert',
+    'DROP TRIGGER IF EXISTS notes_note_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_note_fts_update',
+    'DROP TABLE IF EXISTS notes_note_fts',
+)
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in (CREATE_TABLE, *CREATE_TRIGGERS, REBUILD):
+        schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -1,8 +1,21 @@
+import itertools
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 from pytils.translit import slugify
 
+# Сколько раз пробуем подобрать slug, если его одновременно заняли.
+# Каждая неудача означает, что другая заметка сохранилась, поэтому
+# попыток хватает, пока одинаковых заголовков пишут меньше 50 сразу.
+SLUG_ATTEMPTS = 50
+# Место под суффикс вида «-12345» при обрезке длинного slug.
+SLUG_SUFFIX_RESERVE = 11
+# Основа slug для заголовка, из которого slugify ничего не оставил
+# (например, «!!!»): пустая основа дала бы slug «» и «-2», а запрос по
+# её префиксу читал бы все заметки.
+DEFAULT_SLUG_STEM = 'note'
+
 
 class Note(models.Model):
     title = models.CharField(
@@ -28,11 +41,113 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Если slug не задан, подбираем свободный по заголовку.
+
+        Проверка и вставка не атомарны: две заметки с одинаковым заголовком
+        могут получить один slug. Тогда вставка упадёт на уникальном
+        индексе, и мы подберём следующий свободный суффикс.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for _ in range(SLUG_ATTEMPTS):
+            self.slug = self.allocate_slug()
+            try:
+                return self.save_in_savepoint(*args, **kwargs)
+            except IntegrityError:
+                if not self.slug_is_taken():
+                    raise
+        raise IntegrityError(f'Не удалось подобрать slug для «{self.title}».')
+
+    def save_in_savepoint(self, *args, **kwargs):
+        """
+        Сохраняет так, чтобы после IntegrityError можно было продолжить.
+
+        Внутри транзакции ошибку изолирует точка сохранения. Вне её
+        одиночный INSERT откатывается сам, а лишний BEGIN навредил бы:
+        SQLite не ждёт блокировку на запись, если транзакция уже читала.
+        """
+        if transaction.get_connection().in_atomic_block:
+            with transaction.atomic():
+                return super().save(*args, **kwargs)
+        return super().save(*args, **kwargs)
+
+    def slug_is_taken(self):
+        return type(self).objects.filter(
+            slug=self.slug
+        ).exclude(pk=self.pk).exists()
+
+    def allocate_slug(self):
+        """
+        Свободный slug вида «title», «title-2», «title-3»...
+
+        Все занятые варианты читаются одним запросом по диапазону
+        префикса, который обслуживается уникальным индексом slug.
+        """
+        stem = slug_stem(self.title)
+        taken = set(notes_with_slug_prefix(stem).exclude(
+            pk=self.pk
+        ).values_list('slug', flat=True))
+        return first_free_slug(stem, lambda slug: slug not in taken)
+
+
+def slug_max_length():
+    return Note._meta.get_field('slug').max_length
+
+
+def slug_stem(title):
+    """slug по заголовку, обрезанный до длины поля; никогда не пустой."""
+    return slugify(title)[:slug_max_length()] or DEFAULT_SLUG_STEM
+
+
+def slug_prefix_range(stem):
+    """
+    Условие на slug, который может совпасть с «stem» или «stem-N».
+
+    Читаются сам stem и диапазон «stem-» с цифрой после дефиса (цифры
+    идут в таблице подряд, за «9» следует «:»), а не все slug, которые
+    начинаются со stem: для короткой основы вроде «note» это была бы
+    заметная часть таблицы. Только если «stem-N» не влезает в поле и
+    first_free_slug обрезает основу, добавляем диапазон обрезанного
+    префикса — он длинный и выбирает мало строк.
+    """
+    condition = models.Q(slug=stem) | models.Q(
+        slug__gte=f'{stem}-0', slug__lt=f'{stem}-:'
+    )
+    max_stem_length = slug_max_length() - SLUG_SUFFIX_RESERVE
+    if len(stem) > max_stem_length:
+        prefix = stem[:max_stem_length]
+        condition |= models.Q(
+            slug__gte=prefix, slug__lt=prefix + chr(0x10FFFF)
+        )
+    return condition
+
+
+def notes_with_slug_prefix(stem):
+    return Note.objects.filter(slug_prefix_range(stem))
+
+
+def first_free_slug(stem, is_free, numbers=None):
+    """
+    Первый свободный из «stem», «stem-2», «stem-3»...
+
+    numbers — источник номеров суффиксов; при подборе многих slug для
+    одного заголовка можно передать общий счётчик, чтобы не проверять
+    заново уже занятые номера.
+    """
+    if is_free(stem):
+        return stem
+    for number in numbers or itertools.count(2):
+        suffix = f'-{number}'
+        slug = stem[:slug_max_length() - len(suffix)] + suffix
+        if is_free(slug):
+            return slug
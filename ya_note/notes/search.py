@@ -0,0 +1,74 @@
+"""
+Поиск по заметкам.
+
+На SQLite используется полнотекстовый индекс FTS5 (см. миграцию
+0003_note_fts), на других СУБД и при отключённой настройке
+NOTES_FULLTEXT_SEARCH — поиск подстрок через icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+# Вес совпадения в заголовке и в тексте для ранжирования bm25.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+
+def split_query(query):
+    """Слова запроса; знаки препинания и операторы FTS5 отбрасываются."""
+    return re.findall(r'\w+', query)
+
+
+def fulltext_available():
+    return settings.NOTES_FULLTEXT_SEARCH and connection.vendor == 'sqlite'
+
+
+def fulltext_search(queryset, query, limit):
+    """
+    Заметки из queryset, найденные FTS5, от самых релевантных.
+
+    Каждое слово ищется как префикс, все слова обязательны. Ограничения
+    queryset (например, автор) применяются внутри поискового запроса,
+    поэтому LIMIT отсекает уже только доступные пользователю заметки.
+
+    queryset подключается через JOIN, а не через rowid IN (...): с IN
+    FTS5 выполняет MATCH заново для каждой заметки из подзапроса.
+    """
+    words = split_query(query)
+    if not words:
+        return []
+    match = ' '.join(f'"{word}"*' for word in words)
+    scope = queryset.order_by().values('id').query
+    scope_sql, scope_params = scope.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT notes_note_fts.rowid FROM notes_note_fts '
+            'JOIN (' + scope_sql + ') AS scope '
+            'ON scope.id = notes_note_fts.rowid '
+            'WHERE notes_note_fts MATCH %s '
+            'ORDER BY bm25(notes_note_fts, %s, %s) LIMIT %s',
+            (*scope_params, match, TITLE_WEIGHT, TEXT_WEIGHT, limit),
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    notes = queryset.in_bulk(ids)
+    return [notes[pk] for pk in ids if pk in notes]
+
+
+def icontains_search(queryset, query, limit):
+    """Запасной вариант: каждое слово — подстрока заголовка или текста."""
+    words = split_query(query)
+    if not words:
+        return []
+    for word in words:
+        queryset = queryset.filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )
+    return list(queryset.order_by('id')[:limit])
+
+
+def search_notes(queryset, query, limit):
+    if fulltext_available():
+        return fulltext_search(queryset, query, limit)
+    return icontains_search(queryset, query, limit)
@@ -0,0 +1,175 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytils.translit import slugify
+
+from notes.forms import WARNING
+from notes.models import DEFAULT_SLUG_STEM, Note
+from notes.tests.utils import force_login
+
+User = get_user_model()
+
+
+class ApiTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.client_auth = Client()
+        force_login(cls.client_auth, cls.user)
+        cls.other_note = Note.objects.create(
+            title='Чужая', text='Текст', author=cls.other, slug='chuzhaya'
+        )
+
+    def post(self, name, body, client=None):
+        client = client or self.client_auth
+        response = client.post(
+            reverse(name), json.dumps(body), content_type='application/json'
+        )
+        return response.status_code, response.json()
+
+
+class TestCreateApi(ApiTestCase):
+    def test_notes_are_created_with_derived_slugs(self):
+        Note.objects.create(title='Заметка', text='Текст', author=self.user)
+        stem = slugify('Заметка')
+        status, body = self.post('notes:api-add', {'notes': [
+            {'title': 'Заметка', 'text': 'Первая'},
+            {'title': 'Заметка', 'text': 'Вторая'},
+            {'title': 'Своя', 'text': 'Третья', 'slug': 'svoya'},
+        ]})
+        self.assertEqual(status, HTTPStatus.OK)
+        slugs = [item['slug'] for item in body['notes']]
+        self.assertEqual(slugs, [f'{stem}-2', f'{stem}-3', 'svoya'])
+        for item in body['notes']:
+            note = Note.objects.get(pk=item['id'])
+            self.assertEqual(note.slug, item['slug'])
+            self.assertEqual(note.author, self.user)
+
+    def test_titles_without_letters_get_default_stem(self):
+        status, body = self.post('notes:api-add', {'notes': [
+            {'title': '!!!', 'text': 'Первая'},
+            {'title': '...', 'text': 'Вторая'},
+        ]})
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(
+            [item['slug'] for item in body['notes']],
+            [DEFAULT_SLUG_STEM, f'{DEFAULT_SLUG_STEM}-2'],
+        )
+
+    def test_batch_is_validated_as_a_whole(self):
+        before = Note.objects.count()
+        status, body = self.post('notes:api-add', {'notes': [
+            {'title': 'Хорошая', 'text': 'Текст'},
+            {'title': 'Занятый slug', 'text': 'Текст', 'slug': 'chuzhaya'},
+            {'title': 'Повтор', 'text': 'Текст', 'slug': 'povtor'},
+            {'title': 'Повтор', 'text': 'Текст', 'slug': 'povtor'},
+            {'title': 'Без текста'},
+        ]})
+        self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(body['errors'], [
+            {'index': 1, 'errors': {'slug': ['chuzhaya' + WARNING]}},
+            {'index': 3, 'errors': {'slug': ['povtor' + WARNING]}},
+            {'index': 4, 'errors': {'text': ['Обязательное поле.']}},
+        ])
+        self.assertEqual(Note.objects.count(), before)
+
+    def test_queries_do_not_grow_with_batch(self):
+        notes = [
+            {'title': f'Заметка {number}', 'text': 'Текст'}
+            for number in range(300)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            status, _ = self.post('notes:api-add', {'notes': notes})
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertLess(len(queries), 15)
+        self.assertEqual(Note.objects.filter(author=self.user).count(), 300)
+
+    def test_bad_requests(self):
+        status, _ = self.post('notes:api-add', {'notes': []}, Client())
+        self.assertEqual(status, HTTPStatus.UNAUTHORIZED)
+        for body in ({'notes': 'x'}, ['x'], {'notes': ['x']}):
+            with self.subTest(body=body):
+                status, response = self.post('notes:api-add', body)
+                self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+                self.assertIn('error', response)
+
+    def test_out_of_range_ids_are_rejected(self):
+        for item in (10 ** 30, 0, True, '1'):
+            for name, body in (
+                ('notes:api-edit', {'notes': [{'id': item, 'title': 'Т'}]}),
+                ('notes:api-delete', {'ids': [item]}),
+            ):
+                with self.subTest(name=name, item=item):
+                    status, response = self.post(name, body)
+                    self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+                    self.assertIn('error', response)
+
+
+class TestUpdateApi(ApiTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.note = Note.objects.create(
+            title='Старая', text='Текст', author=cls.user, slug='staraya'
+        )
+
+    def test_only_given_fields_change(self):
+        status, body = self.post('notes:api-edit', {'notes': [
+            {'id': self.note.pk, 'text': 'Новый текст'},
+        ]})
+        self.assertEqual(status, HTTPStatus.OK)
+        self.assertEqual(
+            body['notes'], [{'id': self.note.pk, 'slug': 'staraya'}]
+        )
+        self.note.refresh_from_db()
+        self.assertEqual(
+            (self.note.title, self.note.text), ('Старая', 'Новый текст')
+        )
+
+    def test_blank_slug_is_derived_from_new_title(self):
+        status, body = self.post('notes:api-edit', {'notes': [
+            {'id': self.note.pk, 'title': 'Новая', 'slug': ''},
+        ]})
+        self.assertEqual(status, HTTPStatus.OK)
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.slug, slugify('Новая'))
+
+    def test_foreign_and_repeated_notes_are_rejected(self):
+        status, body = self.post('notes:api-edit', {'notes': [
+            {'id': self.other_note.pk, 'title': 'Моя'},
+            {'id': self.note.pk, 'title': 'Раз'},
+            {'id': self.note.pk, 'title': 'Два'},
+        ]})
+        self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(
+            [error['index'] for error in body['errors']], [0, 1, 2]
+        )
+        self.other_note.refresh_from_db()
+        self.assertEqual(self.other_note.title, 'Чужая')
+
+
+class TestDeleteApi(ApiTestCase):
+    def test_own_notes_are_deleted(self):
+        notes = [
+            Note.objects.create(title=f'З{number}', text='Т', author=self.user)
+            for number in range(3)
+        ]
+        ids = [note.pk for note in notes]
+        status, body = self.post('notes:api-delete', {'ids': ids})
+        self.assertEqual((status, body), (HTTPStatus.OK, {'deleted': 3}))
+        self.assertFalse(Note.objects.filter(pk__in=ids).exists())
+
+    def test_foreign_notes_are_not_deleted(self):
+        note = Note.objects.create(title='Моя', text='Т', author=self.user)
+        status, body = self.post(
+            'notes:api-delete', {'ids': [note.pk, self.other_note.pk]}
+        )
+        self.assertEqual(status, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(body['errors'][0]['index'], 1)
+        self.assertTrue(Note.objects.filter(pk=note.pk).exists())
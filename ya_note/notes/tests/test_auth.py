@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from yacommon.auth_backends import USER_CACHE
+from yacommon.request_stats import QueryCounter
+
+User = get_user_model()
+
+ENGINES = ('cached_db', 'signed_cookies')
+
+
+def session_profile(engine):
+    return override_settings(
+        SESSION_ENGINE=f'django.contrib.sessions.backends.{engine}',
+        AUTHENTICATION_BACKENDS=['yacommon.auth_backends.CachedUserBackend'],
+        USER_CACHE_TIMEOUT=30,
+    )
+
+
+class TestSessionProfiles(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст', slug='note', author=cls.author
+        )
+
+    def setUp(self):
+        USER_CACHE.clear()
+        self.addCleanup(USER_CACHE.clear)
+
+    def logged_in_client(self):
+        # Клиент создаётся после смены настроек: SessionMiddleware читает
+        # SESSION_ENGINE при загрузке.
+        client = Client()
+        client.force_login(self.author)
+        return client
+
+    def count_queries(self, url):
+        """Запросы к БД при повторном открытии url автором."""
+        client = self.logged_in_client()
+        client.get(url)
+        counter = QueryCounter()
+        with counter.installed():
+            client.get(url)
+        return counter.queries
+
+    def test_profiles_skip_session_and_user_queries(self):
+        urls = (
+            reverse('notes:list'),
+            reverse('notes:detail', args=(self.note.slug,)),
+        )
+        for url in urls:
+            default = self.count_queries(url)
+            for engine in ENGINES:
+                with self.subTest(url=url, engine=engine), session_profile(
+                    engine
+                ):
+                    self.assertEqual(self.count_queries(url), default - 2)
+
+    def test_password_change_logs_out_cached_user(self):
+        url = reverse('notes:detail', args=(self.note.slug,))
+        for engine in ENGINES:
+            with self.subTest(engine=engine), session_profile(engine):
+                client = self.logged_in_client()
+                self.assertEqual(client.get(url).status_code, HTTPStatus.OK)
+                self.assertEqual(USER_CACHE.get(self.author.pk), self.author)
+                self.author.set_password(f'пароль {engine}')
+                self.author.save()
+                self.assertIsNone(USER_CACHE.get(self.author.pk))
+                response = client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
+                self.assertTrue(
+                    response.url.startswith(reverse('users:login'))
+                )
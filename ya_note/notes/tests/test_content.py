@@ -1,7 +1,15 @@
+import copy
+from http import HTTPStatus
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.template import engines
+from django.test import Client, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 from notes.models import Note
+from notes.tests.utils import force_login
+from yacommon.warmup import warm_templates
 
 User = get_user_model()
 
@@ -12,7 +20,7 @@ class TestListPage(TestCase):
         cls.guest_client = Client()
         cls.user = User.objects.create_user(username='auth')
         cls.authorized_client = Client()
-        cls.authorized_client.force_login(cls.user)
+        force_login(cls.authorized_client, cls.user)
         cls.note = Note.objects.create(
             title='Title',
             text='Text',
@@ -39,3 +47,126 @@ class TestListPage(TestCase):
             'notes:edit', args=(self.note.slug,))
         )
         self.assertIn('form', response.context)
+
+
+@override_settings(NOTES_PAGE_SIZE=2)
+class TestListPagination(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.authorized_client = Client()
+        force_login(cls.authorized_client, cls.user)
+        cls.notes = [
+            Note.objects.create(
+                title=f'Title {index}',
+                text='Text',
+                author=cls.user,
+                slug=f'slug-{index}'
+            )
+            for index in range(3)
+        ]
+        cls.url = reverse('notes:list')
+
+    def test_pages_follow_id_order(self):
+        response = self.authorized_client.get(self.url)
+        first_page = response.context['object_list']
+        self.assertEqual(first_page, self.notes[:2])
+        next_after = response.context['next_after']
+        response = self.authorized_client.get(
+            self.url, {'after': next_after}
+        )
+        self.assertEqual(response.context['object_list'], self.notes[2:])
+        self.assertIsNone(response.context['next_after'])
+
+    def test_list_does_not_load_note_text(self):
+        response = self.authorized_client.get(self.url)
+        note = response.context['object_list'][0]
+        self.assertEqual(note.get_deferred_fields(), {'text', 'author_id'})
+
+    def test_broken_after_is_rejected(self):
+        for after in ('x', str(10 ** 30), '-1'):
+            with self.subTest(after=after):
+                response = self.authorized_client.get(
+                    self.url, {'after': after}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+
+class TestSearch(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authorized_client = Client()
+        force_login(cls.authorized_client, cls.user)
+        notes = (
+            ('Купить молоко', 'Ещё хлеб и сыр'),
+            ('Рецепт блинов', 'Нужны молоко и мука'),
+            ('Планы', 'Сходить в кино'),
+        )
+        cls.notes = [
+            Note.objects.create(
+                title=title, text=text, author=cls.user, slug=f'note-{index}'
+            )
+            for index, (title, text) in enumerate(notes)
+        ]
+        Note.objects.create(
+            title='Чужое молоко', text='Текст', author=cls.reader,
+            slug='reader-note'
+        )
+        cls.url = reverse('notes:search')
+
+    def search(self, query):
+        response = self.authorized_client.get(self.url, {'q': query})
+        return response.context['object_list']
+
+    def test_search_is_scoped_to_author_and_ranked(self):
+        # Совпадение в заголовке весит больше, чем в тексте.
+        self.assertEqual(self.search('молоко'), self.notes[:2])
+        self.assertEqual(self.search('рецепт молоко'), [self.notes[1]])
+
+    def test_index_follows_updates_and_deletes(self):
+        note = self.notes[2]
+        note.text = 'Сходить в театр'
+        note.save()
+        self.assertEqual(self.search('театр'), [note])
+        self.assertEqual(self.search('кино'), [])
+        note.delete()
+        self.assertEqual(self.search('театр'), [])
+
+    def test_icontains_fallback_matches_fulltext(self):
+        queries = ('молоко', 'хлеб сыр', 'кино', 'блинов', 'нет такого', '')
+        for query in queries:
+            with self.subTest(query=query):
+                fulltext = self.search(query)
+                with self.settings(NOTES_FULLTEXT_SEARCH=False):
+                    fallback = self.search(query)
+                self.assertEqual(set(fulltext), set(fallback))
+
+
+CACHED_TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+CACHED_TEMPLATES[0]['APP_DIRS'] = False
+CACHED_TEMPLATES[0]['OPTIONS']['loaders'] = [(
+    'django.template.loaders.cached.Loader',
+    ['django.template.loaders.filesystem.Loader'],
+)]
+
+
+class TestTemplatesWarmUp(SimpleTestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES, TEMPLATES_WARM_UP=True)
+    def test_warm_up_compiles_every_template(self):
+        directory = Path(settings.BASE_DIR) / 'templates'
+        expected = {
+            path.relative_to(directory).as_posix()
+            for path in directory.rglob('*.html')
+        }
+        self.assertEqual(warm_templates(), len(expected))
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(set(loader.get_template_cache), expected)
+
+    def test_warm_up_is_off_by_default(self):
+        self.assertEqual(warm_templates(), 0)
@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+import zipfile
+from http import HTTPStatus
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.utils import force_login
+
+User = get_user_model()
+
+# Заметок в проверке памяти и допустимый пик памяти при их выгрузке.
+# Проверка идёт около 30 с, поэтому запускается только с SLOW_TESTS=1.
+MANY_NOTES = 200_000
+MEMORY_CEILING = 8 * 1024 * 1024
+
+
+def read_export(response):
+    return b''.join(response.streaming_content)
+
+
+class TestExport(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.other = User.objects.create(username='Другой')
+        cls.notes = [
+            Note.objects.create(
+                title=f'Заметка {number}', text=f'Текст {number}',
+                slug=f'note-{number}', author=cls.author,
+            )
+            for number in range(3)
+        ]
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='chuzhaya', author=cls.other
+        )
+        cls.author_client = Client()
+        force_login(cls.author_client, cls.author)
+
+    def export(self, **params):
+        response = self.author_client.get(reverse('notes:export'), params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return response
+
+    def test_ndjson_contains_only_own_notes(self):
+        response = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = read_export(response).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'slug': note.slug, 'title': note.title, 'text': note.text}
+            for note in self.notes
+        ])
+
+    def test_zip_contains_markdown_file_per_note(self):
+        response = self.export(format='zip')
+        self.assertIn('notes.zip', response['Content-Disposition'])
+        archive = zipfile.ZipFile(io.BytesIO(read_export(response)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            archive.namelist(), [f'{note.slug}.md' for note in self.notes]
+        )
+        self.assertEqual(
+            archive.read('note-1.md').decode(), '# Заметка 1\n\nТекст 1\n'
+        )
+
+    def test_unknown_format_is_rejected(self):
+        response = self.author_client.get(
+            reverse('notes:export'), {'format': 'pdf'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_command_writes_export_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.zip')
+            call_command(
+                'export_notes', self.author.username, path, format='zip',
+                stdout=io.StringIO(),
+            )
+            with zipfile.ZipFile(path) as archive:
+                self.assertEqual(len(archive.namelist()), len(self.notes))
+
+    def test_zip64_end_records_are_readable(self):
+        """
+        Концевые записи ZIP64 пишутся, когда файлов 65535 и больше.
+
+        Столько файлов выгружалось бы пару секунд, поэтому порог понижен:
+        zipfile читает число файлов и положение каталога из записей ZIP64.
+        """
+        with mock.patch('notes.export.ZIP64_COUNT_LIMIT', 2):
+            content = read_export(self.export(format='zip'))
+        self.assertIn(b'PK\x06\x06', content)
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            archive.namelist(), [f'{note.slug}.md' for note in self.notes]
+        )
+
+
+@skipUnless(os.environ.get('SLOW_TESTS') == '1', 'нужен SLOW_TESTS=1')
+class TestExportMemory(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        # Одним INSERT ... SELECT: через bulk_create это в разы дольше.
+        with connection.cursor() as cursor:
+            cursor.execute(f'''
+                WITH RECURSIVE numbers(number) AS (
+                    SELECT 1 UNION ALL
+                    SELECT number + 1 FROM numbers WHERE number < %s
+                )
+                INSERT INTO {Note._meta.db_table}
+                    (title, text, slug, author_id)
+                SELECT 'Заметка ' || number, %s, 'note-' || number, %s
+                FROM numbers
+            ''', [MANY_NOTES, 'Текст заметки. ' * 10, cls.author.pk])
+
+    def test_memory_does_not_grow_with_notes(self):
+        client = Client()
+        force_login(client, self.author)
+        for export_format in ('ndjson', 'zip'):
+            with self.subTest(format=export_format):
+                tracemalloc.start()
+                try:
+                    response = client.get(
+                        reverse('notes:export'), {'format': export_format}
+                    )
+                    size = 0
+                    for chunk in response.streaming_content:
+                        size += len(chunk)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                self.assertGreater(size, 3 * MEMORY_CEILING)
+                self.assertLess(peak, MEMORY_CEILING)
@@ -0,0 +1,176 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytils.translit import slugify
+
+from notes.export import export_chunks
+from notes.importer import MAX_MARKDOWN_SIZE, import_notes, ndjson_items
+from notes.models import Note
+from notes.tests.utils import force_login
+
+User = get_user_model()
+
+
+def ndjson(items):
+    return ''.join(
+        json.dumps(item, ensure_ascii=False) + '\n' for item in items
+    ).encode()
+
+
+class TestImport(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.other = User.objects.create(username='Другой')
+        Note.objects.create(
+            title='Заметка', text='Текст', slug=slugify('Заметка'),
+            author=cls.other,
+        )
+        cls.author_client = Client()
+        force_login(cls.author_client, cls.author)
+
+    def upload(self, name, content):
+        return self.author_client.post(
+            reverse('notes:import'),
+            {'file': SimpleUploadedFile(name, content)},
+        )
+
+    def test_upload_creates_notes_with_derived_slugs(self):
+        response = self.upload('notes.ndjson', ndjson([
+            {'title': 'Заметка', 'text': 'Первая'},
+            {'title': 'Заметка', 'text': 'Вторая'},
+            {'title': 'Своя', 'text': 'Третья', 'slug': 'svoya'},
+        ]))
+        self.assertRedirects(response, reverse('notes:success'))
+        stem = slugify('Заметка')
+        self.assertEqual(
+            list(Note.objects.filter(author=self.author).order_by(
+                'id'
+            ).values_list('slug', 'text')),
+            [(f'{stem}-2', 'Первая'), (f'{stem}-3', 'Вторая'),
+             ('svoya', 'Третья')],
+        )
+
+    def test_zip_export_imports_back(self):
+        notes = [
+            Note.objects.create(
+                title=f'Заметка {number}', text=f'Текст\n\nабзац {number}',
+                slug=f'note-{number}', author=self.author,
+            )
+            for number in range(3)
+        ]
+        expected = [(note.title, note.text, note.slug) for note in notes]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.zip')
+            with open(path, 'wb') as file:
+                file.writelines(export_chunks(
+                    Note.objects.filter(author=self.author), 'zip'
+                ))
+            Note.objects.filter(author=self.author).delete()
+            call_command(
+                'import_notes', self.author.username, path,
+                stdout=io.StringIO(),
+            )
+        self.assertEqual(
+            list(Note.objects.filter(author=self.author).order_by(
+                'id'
+            ).values_list('title', 'text', 'slug')),
+            expected,
+        )
+
+    def test_invalid_note_rolls_back_whole_import(self):
+        items = [
+            {'title': f'Заметка {number}', 'text': 'Текст'}
+            for number in range(5)
+        ]
+        del items[3]['text']
+        imported, errors = import_notes(self.author, items, chunk_size=2)
+        self.assertEqual(imported, 0)
+        self.assertEqual(errors, [(3, {'text': ['Обязательное поле.']})])
+        self.assertFalse(Note.objects.filter(author=self.author).exists())
+
+    def test_taken_slugs_from_file_get_suffix(self):
+        stem = slugify('Заметка')
+        items = [
+            {'title': 'Первая', 'text': 'Текст', 'slug': stem},
+            {'title': 'Вторая', 'text': 'Текст', 'slug': 'svoya'},
+            {'title': 'Третья', 'text': 'Текст', 'slug': 'svoya'},
+        ]
+        imported, errors = import_notes(self.author, items, chunk_size=2)
+        self.assertEqual((imported, errors), (3, []))
+        self.assertEqual(
+            list(Note.objects.filter(author=self.author).order_by(
+                'id'
+            ).values_list('slug', flat=True)),
+            [f'{stem}-2', 'svoya', 'svoya-2'],
+        )
+
+    def test_same_file_names_in_zip_get_suffix(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as file:
+            file.writestr('one/note.md', '# Первая\nТекст')
+            file.writestr('two/note.md', '# Вторая\nТекст')
+        response = self.upload('notes.zip', archive.getvalue())
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertEqual(
+            list(Note.objects.filter(author=self.author).order_by(
+                'id'
+            ).values_list('slug', flat=True)),
+            ['note', 'note-2'],
+        )
+
+    def test_oversized_markdown_is_rejected(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as file:
+            file.writestr('big.md', 'x' * (MAX_MARKDOWN_SIZE + 1))
+        response = self.upload('notes.zip', archive.getvalue())
+        self.assertFormError(
+            response, 'form', 'file', 'big.md: файл больше 1 МБ.'
+        )
+        self.assertFalse(Note.objects.filter(author=self.author).exists())
+
+    def test_errors_are_shown_on_the_form(self):
+        response = self.upload('notes.ndjson', ndjson([
+            {'title': 'Без текста'},
+        ]))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFormError(
+            response, 'form', None, 'Заметка 1, text: Обязательное поле.'
+        )
+        response = self.upload('notes.ndjson', b'{"title": "x"}\nnot json\n')
+        self.assertFormError(
+            response, 'form', 'file', 'Строка 2: некорректный JSON.'
+        )
+        response = self.upload('notes.zip', b'not a zip')
+        self.assertFormError(
+            response, 'form', 'file', 'Файл не похож на ZIP-архив.'
+        )
+
+    def test_queries_do_not_grow_with_notes(self):
+        items = ndjson_items(ndjson(
+            {'title': f'Заметка {number % 100}', 'text': 'Текст'}
+            for number in range(1000)
+        ).splitlines())
+        with CaptureQueriesContext(connection) as queries:
+            imported, errors = import_notes(self.author, items)
+        self.assertEqual((imported, errors), (1000, []))
+        self.assertLess(len(queries), 15)
+
+    def test_command_reports_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.ndjson')
+            with open(path, 'wb') as file:
+                file.write(ndjson([{'title': 'Без текста'}]))
+            with self.assertRaisesMessage(CommandError, 'Заметка 1, text'):
+                call_command('import_notes', self.author.username, path)
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from notes.models import Note, slug_prefix_range
+from notes.views import NotesList, NoteUpdate
+
+User = get_user_model()
+
+
+class TestAccessPathIndexes(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Title',
+            text='Text',
+            author=cls.author,
+            slug='slug'
+        )
+
+    def view_queryset(self, view_class, **kwargs):
+        request = RequestFactory().get('/')
+        request.user = self.author
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view.get_queryset()
+
+    def assertUsesIndexes(self, queryset):
+        """План SQLite не должен содержать полного обхода или сортировки."""
+        plan = queryset.explain()
+        self.assertNotIn('USE TEMP B-TREE', plan)
+        for line in plan.splitlines():
+            if ' SCAN ' in f' {line} ':
+                self.assertIn('INDEX', line, plan)
+
+    def test_notes_list_uses_author_index(self):
+        self.assertUsesIndexes(self.view_queryset(NotesList))
+
+    def test_single_note_lookup_uses_index(self):
+        queryset = self.view_queryset(NoteUpdate, slug=self.note.slug)
+        self.assertUsesIndexes(queryset.filter(slug=self.note.slug))
+
+    def test_slug_prefix_ranges_use_index(self):
+        """Так bulk.allocate_slugs читает занятые slug многих заголовков."""
+        queryset = Note.objects.filter(
+            slug_prefix_range('zametka') | slug_prefix_range('spisok')
+        )
+        self.assertUsesIndexes(queryset)
+        self.assertIn('MULTI-INDEX OR', queryset.explain())
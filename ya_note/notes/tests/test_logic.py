@@ -1,11 +1,16 @@
 # news/tests/test_logic.py
+import threading
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
+from pytils.translit import slugify
 
-from notes.models import Note
+from notes.forms import WARNING
+from notes.models import DEFAULT_SLUG_STEM, Note, notes_with_slug_prefix
+from notes.tests.utils import force_login
 
 User = get_user_model()
 
@@ -18,7 +23,7 @@ class TestCommentCreation(TestCase):
         cls.guest_client = Client()
         cls.user = User.objects.create_user(username='auth')
         cls.authorized_client = Client()
-        cls.authorized_client.force_login(cls.user)
+        force_login(cls.authorized_client, cls.user)
         cls.note = Note.objects.create(
             title='Title',
             text='Text',
@@ -69,10 +74,10 @@ class TestCommentEditDelete(TestCase):
         cls.author = User.objects.create(username='Автор комментария')
         cls.author_client = Client()
         cls.notauthor_client = Client()
-        cls.author_client.force_login(cls.user)
+        force_login(cls.author_client, cls.user)
         cls.reader = User.objects.create(username='Читатель')
         cls.reader_client = Client()
-        cls.reader_client.force_login(cls.reader)
+        force_login(cls.reader_client, cls.reader)
         cls.edit_url = reverse('notes:edit', args=(cls.note.slug,))
         cls.delete_url = reverse('notes:delete', args=(cls.note.slug,))
         cls.form_data = {'text': cls.NEW_COMMENT_TEXT}
@@ -113,3 +118,92 @@ class TestCommentEditDelete(TestCase):
         )
         self.assertEqual(Note.objects.count(), note_count)
         self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+
+
+class TestSlugAllocation(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.author_client = Client()
+        force_login(cls.author_client, cls.user)
+        cls.url = reverse('notes:add')
+
+    def test_empty_slug_gets_numeric_suffix(self):
+        form_data = {'title': 'Заголовок', 'text': 'Текст', 'slug': ''}
+        for _ in range(3):
+            self.author_client.post(self.url, data=form_data)
+        slugs = set(Note.objects.values_list('slug', flat=True))
+        stem = slugify(form_data['title'])
+        self.assertEqual(slugs, {stem, f'{stem}-2', f'{stem}-3'})
+
+    def test_explicit_duplicate_slug_is_rejected(self):
+        Note.objects.create(
+            title='Title', text='Text', author=self.user, slug='slug'
+        )
+        form_data = {'title': 'Другой', 'text': 'Текст', 'slug': 'slug'}
+        response = self.author_client.post(self.url, data=form_data)
+        self.assertFormError(response, 'form', 'slug', 'slug' + WARNING)
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_title_without_letters_gets_default_stem(self):
+        first = Note.objects.create(title='!!!', text='x', author=self.user)
+        second = Note.objects.create(title='?', text='x', author=self.user)
+        self.assertEqual(first.slug, DEFAULT_SLUG_STEM)
+        self.assertEqual(second.slug, f'{DEFAULT_SLUG_STEM}-2')
+
+    def test_slug_lookup_skips_other_slugs_with_same_prefix(self):
+        for slug in ('note', 'note-2', 'notebook', 'note-taking', 'nota'):
+            Note.objects.create(
+                title='x', text='x', author=self.user, slug=slug
+            )
+        self.assertEqual(
+            set(notes_with_slug_prefix('note').values_list(
+                'slug', flat=True
+            )),
+            {'note', 'note-2'},
+        )
+        note = Note.objects.create(title='Note', text='x', author=self.user)
+        self.assertEqual(note.slug, 'note-3')
+
+    def test_long_title_suffix_fits_max_length(self):
+        title = 'a' * 100
+        first = Note.objects.create(title=title, text='x', author=self.user)
+        second = Note.objects.create(title=title, text='x', author=self.user)
+        self.assertEqual(first.slug, 'a' * 100)
+        self.assertEqual(second.slug, 'a' * 98 + '-2')
+
+
+class TestSlugConcurrency(TransactionTestCase):
+    THREADS = 20
+
+    def test_parallel_creates_with_same_title(self):
+        user = User.objects.create(username='auth')
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+
+        def create_note():
+            try:
+                barrier.wait()
+                Note.objects.create(title='Заголовок', text='x', author=user)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=create_note)
+            for _ in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stem = slugify('Заголовок')
+        expected = {stem} | {
+            f'{stem}-{number}' for number in range(2, self.THREADS + 1)
+        }
+        self.assertEqual(
+            set(Note.objects.values_list('slug', flat=True)), expected
+        )
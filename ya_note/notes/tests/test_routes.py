@@ -1,5 +1,6 @@
 from http import HTTPStatus
 from notes.models import Note
+from notes.tests.utils import force_login
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -40,7 +41,7 @@ class TestRoutes(TestCase):
             (self.reader, HTTPStatus.NOT_FOUND)
         )
         for user, status in user_status:
-            self.client.force_login(user)
+            force_login(self.client, user)
             for name in ('notes:edit', 'notes:detail', 'notes:delete'):
                 with self.subTest(user=user, name=name):
                     url = reverse(name, args=(self.note.slug,))
@@ -52,7 +53,7 @@ class TestRoutes(TestCase):
             (self.author, HTTPStatus.OK),
         )
         for user, status in user_status:
-            self.client.force_login(user)
+            force_login(self.client, user)
             for name in ('notes:add', 'notes:success'):
                 with self.subTest(user=user, name=name):
                     url = reverse(name)
@@ -70,7 +71,8 @@ class TestRoutes(TestCase):
 
     def test_another_redirect_for_anonymos(self):
         login_url = reverse('users:login')
-        for name in ('notes:add', 'notes:list', 'notes:success'):
+        for name in ('notes:add', 'notes:list', 'notes:success',
+                     'notes:search', 'notes:export', 'notes:import'):
             url = reverse(name)
             redirect_url = f'{login_url}?next={url}'
             response = self.client.get(url)
@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.utils import force_login
+from yacommon.request_stats import STATS, Histogram, QueryCounter
+
+User = get_user_model()
+
+
+class TestRequestStats(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.staff = User.objects.create(username='Админ', is_staff=True)
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст', slug='note', author=cls.author
+        )
+
+    def setUp(self):
+        # Статистика живёт в памяти процесса и не откатывается вместе с БД.
+        STATS.reset()
+        self.addCleanup(STATS.reset)
+
+    def client_for(self, user):
+        # Middleware загружаются при первом запросе клиента: новый клиент
+        # видит текущее значение REQUEST_STATS.
+        client = Client()
+        force_login(client, user)
+        return client
+
+    def test_stats_are_off_by_default(self):
+        response = self.client_for(self.author).get(
+            reverse('notes:detail', args=(self.note.slug,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(hasattr(response.wsgi_request, 'request_metrics'))
+        self.assertEqual(STATS.as_dict(), {})
+
+    @override_settings(REQUEST_STATS=True)
+    def test_detail_page_metrics(self):
+        client = self.client_for(self.author)
+        url = reverse('notes:detail', args=(self.note.slug,))
+        # connection.queries сбрасывается в начале каждого запроса клиента,
+        # поэтому запросы считаем своей обёрткой.
+        counter = QueryCounter()
+        with counter.installed():
+            response = client.get(url)
+        stats = STATS.as_dict()['notes:detail']
+        self.assertEqual(stats['time_ms']['count'], 1)
+        self.assertEqual(stats['render_ms']['count'], 1)
+        self.assertLessEqual(
+            stats['render_ms']['max'], stats['time_ms']['max']
+        )
+        self.assertEqual(stats['queries']['max'], counter.queries)
+        self.assertEqual(
+            stats['response_bytes']['max'], len(response.content)
+        )
+
+    @override_settings(REQUEST_STATS=True)
+    def test_streamed_export_is_recorded_when_sent(self):
+        response = self.client_for(self.author).get(reverse('notes:export'))
+        self.assertNotIn('notes:export', STATS.as_dict())
+        counter = QueryCounter()
+        with counter.installed():
+            content = b''.join(response.streaming_content)
+        stats = STATS.as_dict()['notes:export']
+        self.assertEqual(stats['response_bytes']['max'], len(content))
+        self.assertGreater(counter.queries, 0)
+        self.assertGreater(stats['queries']['max'], counter.queries)
+
+    def test_stats_endpoint_is_for_staff_only(self):
+        cases = (
+            (self.author, True, HTTPStatus.FORBIDDEN),
+            (self.staff, True, HTTPStatus.OK),
+            (self.staff, False, HTTPStatus.NOT_FOUND),
+        )
+        for user, enabled, expected_status in cases:
+            with self.subTest(user=user, enabled=enabled), override_settings(
+                REQUEST_STATS=enabled
+            ):
+                client = self.client_for(user)
+                client.get(reverse('notes:home'))
+                response = client.get(reverse('stats'))
+                self.assertEqual(response.status_code, expected_status)
+                if expected_status == HTTPStatus.OK:
+                    stats = json.loads(response.content)
+                    self.assertEqual(
+                        stats['notes:home']['time_ms']['count'], 2
+                    )
+
+    @override_settings(REQUEST_STATS=True)
+    def test_stats_dump_to_json(self):
+        self.client_for(self.author).get('/missing/')
+        with tempfile.TemporaryDirectory() as directory:
+            STATS.dump(os.path.join(directory, 'stats-{pid}.json'))
+            name, = os.listdir(directory)
+            with open(os.path.join(directory, name), encoding='utf-8') as file:
+                self.assertEqual(list(json.load(file)), ['<unresolved>'])
+
+    def test_histogram_percentiles_are_close(self):
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.add(value)
+        for percent in (50, 90, 99):
+            exact = percent * 10
+            self.assertLessEqual(exact, histogram.percentile(percent))
+            self.assertLess(histogram.percentile(percent), exact * 1.2)
+        self.assertEqual(histogram.percentile(100), 1000)
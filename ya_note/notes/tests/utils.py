@@ -0,0 +1,22 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import (BACKEND_SESSION_KEY, HASH_SESSION_KEY,
+                                 SESSION_KEY)
+
+
+def force_login(client, user):
+    """
+    Входит в client пользователем user, как client.force_login(user).
+
+    client.force_login проходит весь login(): меняет ключ сессии,
+    отправляет user_logged_in (он записывает last_login) и сохраняет
+    сессию дважды — около 5 мс на вход. Здесь сессия с теми же ключами
+    сохраняется один раз, около 1 мс.
+    """
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
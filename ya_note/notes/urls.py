@@ -1,6 +1,6 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
 
 app_name = 'notes'
 
@@ -11,5 +11,13 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('import/', views.NoteImport.as_view(), name='import'),
+    path('export/', views.NoteExport.as_view(), name='export'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('api/notes/add/', api.NotesCreateApi.as_view(), name='api-add'),
+    path('api/notes/edit/', api.NotesUpdateApi.as_view(), name='api-edit'),
+    path(
+        'api/notes/delete/', api.NotesDeleteApi.as_view(), name='api-delete'
+    ),
 ]
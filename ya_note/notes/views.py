@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
+from django.db.models import BigIntegerField
+from django.http import StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .export import FORMATS, export_chunks
+from .forms import ImportForm, NoteForm
+from .importer import describe_errors, import_notes, read_items
 from .models import Note
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -50,10 +57,119 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя, по странице за раз.
+
+    Страницы листаются по id (параметр after), а не через OFFSET, поэтому
+    любая страница стоит одинаково. Из БД берём только выводимые поля.
+    """
     template_name = 'notes/list.html'
 
+    def get_page_size(self):
+        return settings.NOTES_PAGE_SIZE
+
+    def get_after(self):
+        after = self.request.GET.get('after')
+        if after is None:
+            return None
+        try:
+            after = int(after)
+        except ValueError:
+            raise BadRequest('Некорректный параметр after.')
+        # Число вне диапазона id драйвер БД не передал бы в запрос.
+        if not 0 <= after <= BigIntegerField.MAX_BIGINT:
+            raise BadRequest('Некорректный параметр after.')
+        return after
+
+    def get_queryset(self):
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.get_after()
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        # Одна лишняя заметка показывает, есть ли следующая страница.
+        return queryset[:self.get_page_size() + 1]
+
+    def get_context_data(self, **kwargs):
+        notes = list(self.object_list)
+        page_size = self.get_page_size()
+        next_after = None
+        if len(notes) > page_size:
+            notes = notes[:page_size]
+            next_after = notes[-1].id
+        kwargs.update(
+            object_list=notes,
+            next_after=next_after,
+            is_first_page=self.get_after() is None,
+        )
+        return super().get_context_data(**kwargs)
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заголовкам и текстам заметок пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_notes(
+            super().get_queryset(), self.query, settings.NOTES_PAGE_SIZE
+        )
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.query, **kwargs)
+
+
+class NoteExport(NoteBase, generic.View):
+    """
+    Выгрузка всех заметок пользователя одним файлом.
+
+    Параметр format: ndjson (по умолчанию) или zip с файлами slug.md.
+    Ответ отдаётся потоком, пока заметки читаются из БД.
+    """
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'ndjson')
+        if export_format not in FORMATS:
+            raise BadRequest('Некорректный параметр format.')
+        response = StreamingHttpResponse(
+            export_chunks(self.get_queryset(), export_format),
+            content_type=FORMATS[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{export_format}"'
+        )
+        return response
+
+
+class NoteImport(LoginRequiredMixin, generic.FormView):
+    """
+    Импорт заметок из файла.
+
+    Файл разбирается по мере чтения, заметки создаются пачками. Если
+    хоть одна не прошла проверку, не создаётся ни одна, а ошибки
+    показываются над формой.
+    """
+    template_name = 'notes/import.html'
+    form_class = ImportForm
+    success_url = reverse_lazy('notes:success')
+
+    def form_valid(self, form):
+        file = form.cleaned_data['file']
+        try:
+            _, errors = import_notes(
+                self.request.user, read_items(file, file.name)
+            )
+        except ValueError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        if errors:
+            for line in describe_errors(errors):
+                form.add_error(None, line)
+            return self.form_invalid(form)
+        return super().form_valid(form)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,6 +23,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым: замеряет всю цепочку, см. yacommon.request_stats.
+    'yacommon.request_stats.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +52,20 @@ TEMPLATES = [
     },
 ]
 
+# Профиль шаблонов для продакшена включается переменной окружения
+# TEMPLATES_PROFILE=production: скомпилированные шаблоны хранятся в памяти
+# процесса, а при запуске (wsgi.py, asgi.py) заранее компилируются все
+# шаблоны из templates/.
+TEMPLATES_WARM_UP = os.environ.get('TEMPLATES_PROFILE') == 'production'
+if TEMPLATES_WARM_UP:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [(
+        'django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ],
+    )]
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
@@ -56,9 +73,52 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Тестовая БД в файле, а не в памяти: параллельные соединения
+        # в тестах на гонки ждут блокировку, а не падают с ошибкой.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Файл тестовой БД: parallel_tests.py даёт каждому процессу pytest
+# свою копию заранее подготовленной БД.
+if os.environ.get('TEST_DB_NAME'):
+    DATABASES['default']['TEST'] = {'NAME': os.environ['TEST_DB_NAME']}
+
+
+# Профиль БД для продакшена включается переменной окружения
+# DB_PROFILE=production: журнал WAL (чтение не ждёт записи), отображение
+# файла в память, больший кэш страниц, ожидание блокировок вместо ошибки
+# и постоянные соединения вместо нового на каждый запрос.
+if os.environ.get('DB_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'ENGINE': 'yacommon.backends.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'mmap_size': 256 * 2 ** 20,
+                'cache_size': -64 * 1024,
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+
+
+# Профиль сессий включается переменной окружения SESSION_PROFILE:
+# cached_db — сессии читаются из кэша и записываются в БД,
+# signed_cookies — хранятся в подписанной cookie (клиент видит их
+# содержимое, но не может подделать). В обоих профилях пользователь
+# сессии USER_CACHE_TIMEOUT секунд берётся из кэша процесса
+# (yacommon.auth_backends). Смена профиля разлогинивает всех.
+SESSION_PROFILE = os.environ.get('SESSION_PROFILE')
+USER_CACHE_TIMEOUT = 0
+if SESSION_PROFILE in ('cached_db', 'signed_cookies'):
+    SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_PROFILE}'
+    AUTHENTICATION_BACKENDS = ['yacommon.auth_backends.CachedUserBackend']
+    USER_CACHE_TIMEOUT = 30
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +147,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_PAGE_SIZE = 100
+
+# Искать по индексу SQLite FTS5; иначе — подстроки через icontains.
+NOTES_FULLTEXT_SEARCH = True
+# Наибольшее число заметок в одном запросе к пакетному API.
+NOTES_API_MAX_BATCH = 10_000
+
+# Статистика запросов по представлениям (yacommon.request_stats):
+# REQUEST_STATS=1. Выключенный middleware не участвует в обработке.
+REQUEST_STATS = os.environ.get('REQUEST_STATS') == '1'
+# Файл, куда статистика пишется при завершении процесса; {pid} в имени
+# заменяется номером процесса. None — не записывать.
+REQUEST_STATS_FILE = os.environ.get('REQUEST_STATS_FILE')
@@ -0,0 +1,6 @@
+"""
+Код, общий для проектов ya_news и ya_note.
+
+Каждый проект запускается из своего каталога, поэтому пакет проекта
+(yanews, yanote) при импорте добавляет корень репозитория в sys.path.
+"""
@@ -0,0 +1,83 @@
+"""
+Аутентификация с кэшем пользователей в памяти процесса.
+
+AuthenticationMiddleware на каждый запрос вошедшего пользователя
+загружает его из БД. CachedUserBackend хранит загруженных
+пользователей USER_CACHE_TIMEOUT секунд и отдаёт каждому запросу
+копию, так что запросы не видят изменений друг друга.
+
+Сохранение или удаление пользователя сбрасывает его запись, поэтому
+смена пароля или блокировка в этом процессе действуют сразу. Другие
+процессы узнают о них не позже чем через USER_CACHE_TIMEOUT, как и
+об изменениях через QuerySet.update, который не отправляет сигналов.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.signals import post_delete, post_save
+
+# Сколько пользователей хранить: при переполнении вытесняются
+# добавленные раньше всех.
+USER_CACHE_SIZE = 10_000
+
+
+class UserCache:
+    """Пользователи по id со сроком хранения; безопасен для потоков."""
+
+    def __init__(self, size=USER_CACHE_SIZE):
+        self.size = size
+        self.lock = threading.Lock()
+        self.users = {}
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.users.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return copy.copy(entry[1])
+
+    def set(self, user_id, user, timeout):
+        with self.lock:
+            self.users.pop(user_id, None)
+            if len(self.users) >= self.size:
+                del self.users[next(iter(self.users))]
+            self.users[user_id] = (
+                time.monotonic() + timeout, copy.copy(user)
+            )
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users = {}
+
+
+USER_CACHE = UserCache()
+
+
+class CachedUserBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из USER_CACHE."""
+
+    def get_user(self, user_id):
+        timeout = settings.USER_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(user_id)
+        user = USER_CACHE.get(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                USER_CACHE.set(user_id, user, timeout)
+        return user
+
+
+def invalidate_user(sender, instance, **kwargs):
+    USER_CACHE.invalidate(instance.pk)
+
+
+post_save.connect(invalidate_user, sender=settings.AUTH_USER_MODEL)
+post_delete.connect(invalidate_user, sender=settings.AUTH_USER_MODEL)
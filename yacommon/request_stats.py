@@ -0,0 +1,257 @@
+"""
+Статистика запросов по представлениям.
+
+RequestStatsMiddleware для каждого запроса считает SQL-запросы и время
+в БД, время отрисовки шаблона, размер ответа и общее время, а затем
+добавляет их в гистограммы своего представления (ключ — view_name из
+resolver_match, например news:detail или notes:detail). Гистограммы
+живут в памяти процесса: их отдаёт stats_view в JSON, а при
+REQUEST_STATS_FILE они записываются в файл при завершении процесса.
+
+Включается настройкой REQUEST_STATS (переменная окружения
+REQUEST_STATS=1). Выключенный middleware Django убирает из цепочки
+при запуске, и запросы обрабатываются так, будто его нет.
+
+Время отрисовки шаблона включает и запросы, которые шаблон выполняет
+сам (ленивые QuerySet): они же учтены в запросах и времени БД.
+Для потоковых ответов всё записывается, когда ответ отдан целиком.
+"""
+import atexit
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.http import Http404, JsonResponse
+
+# Корзин гистограммы на каждое удвоение значения: квантили точны
+# с точностью до множителя 2 ** (1 / 4), около 19%.
+SUBBUCKETS = 4
+QUANTILES = (50, 90, 99)
+# Ключ для запросов, не дошедших до представления (например, 404).
+UNRESOLVED = '<unresolved>'
+# Метрики и во сколько раз их значения крупнее единиц в отчёте:
+# время измеряется в микросекундах, а показывается в миллисекундах.
+METRICS = {
+    'time_ms': 1000,
+    'queries': 1,
+    'db_ms': 1000,
+    'render_ms': 1000,
+    'response_bytes': 1,
+}
+
+
+class Histogram:
+    """Гистограмма с логарифмическими корзинами и постоянной памятью."""
+
+    def __init__(self, scale=1):
+        self.scale = scale
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket(value):
+        if value < 1:
+            return 0
+        return int(math.log2(value) * SUBBUCKETS) + 1
+
+    @staticmethod
+    def upper_bound(bucket):
+        return 2 ** (bucket / SUBBUCKETS)
+
+    def add(self, value):
+        bucket = self.bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        """Верхняя граница корзины, в которую попал квантиль percent."""
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.upper_bound(bucket), self.max)
+        return 0
+
+    def as_dict(self):
+        def scaled(value):
+            return round(value / self.scale, 3)
+
+        report = {
+            'count': self.count,
+            'mean': scaled(self.total / self.count) if self.count else 0,
+            'max': scaled(self.max),
+        }
+        for percent in QUANTILES:
+            report[f'p{percent}'] = scaled(self.percentile(percent))
+        report['buckets'] = [
+            [scaled(self.upper_bound(bucket)), self.buckets[bucket]]
+            for bucket in sorted(self.buckets)
+        ]
+        return report
+
+
+class RequestStats:
+    """Гистограммы метрик по представлениям; безопасна для потоков."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view_name, values):
+        """Добавляет значения метрик одного запроса; None пропускаются."""
+        with self.lock:
+            histograms = self.views.get(view_name)
+            if histograms is None:
+                histograms = self.views[view_name] = {
+                    metric: Histogram(scale)
+                    for metric, scale in METRICS.items()
+                }
+            for metric, value in values.items():
+                if value is not None:
+                    histograms[metric].add(value)
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                view_name: {
+                    metric: histogram.as_dict()
+                    for metric, histogram in histograms.items()
+                }
+                for view_name, histograms in sorted(self.views.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+
+    def dump(self, path):
+        """Пишет статистику в JSON; {pid} в пути — номер процесса."""
+        with open(str(path).format(pid=os.getpid()), 'w',
+                  encoding='utf-8') as file:
+            json.dump(self.as_dict(), file, ensure_ascii=False, indent=2)
+
+
+STATS = RequestStats()
+
+
+class QueryCounter:
+    """Обёртка выполнения SQL: число запросов и суммарное время в БД."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    @contextlib.contextmanager
+    def installed(self):
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield
+
+
+class RequestMetrics(QueryCounter):
+    """Метрики одного запроса."""
+
+    def __init__(self):
+        super().__init__()
+        self.start = time.perf_counter()
+        self.render_start = None
+        self.render_time = None
+
+    def rendered(self, response):
+        self.render_time = time.perf_counter() - self.render_start
+
+    def values(self, size):
+        def microseconds(seconds):
+            return None if seconds is None else seconds * 1_000_000
+
+        return {
+            'time_ms': microseconds(time.perf_counter() - self.start),
+            'queries': self.queries,
+            'db_ms': microseconds(self.db_time),
+            'render_ms': microseconds(self.render_time),
+            'response_bytes': size,
+        }
+
+
+class RequestStatsMiddleware:
+    """
+    Собирает метрики запросов в STATS.
+
+    Должен стоять первым в MIDDLEWARE: тогда в замер попадают все
+    остальные middleware, а его process_template_response вызывается
+    последним, непосредственно перед отрисовкой шаблона.
+    """
+
+    dump_registered = False
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_STATS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        path = settings.REQUEST_STATS_FILE
+        if path and not RequestStatsMiddleware.dump_registered:
+            RequestStatsMiddleware.dump_registered = True
+            atexit.register(STATS.dump, path)
+
+    def __call__(self, request):
+        metrics = request.request_metrics = RequestMetrics()
+        with metrics.installed():
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_name = match.view_name if match else UNRESOLVED
+        if response.streaming:
+            response.streaming_content = self.streamed(
+                response.streaming_content, metrics, view_name
+            )
+        else:
+            STATS.record(view_name, metrics.values(len(response.content)))
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = request.request_metrics
+        metrics.render_start = time.perf_counter()
+        response.add_post_render_callback(metrics.rendered)
+        return response
+
+    @staticmethod
+    def streamed(content, metrics, view_name):
+        """Отдаёт content, считая байты и запросы к БД по ходу отдачи."""
+        size = 0
+        try:
+            with metrics.installed():
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            STATS.record(view_name, metrics.values(size))
+
+
+def stats_view(request):
+    """Статистика запросов этого процесса в JSON; только для персонала."""
+    if not settings.REQUEST_STATS:
+        raise Http404
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse(
+        STATS.as_dict(), json_dumps_params={'ensure_ascii': False}
+    )
@@ -0,0 +1,13 @@
+"""Фикстуры pytest, общие для тестов обоих проектов."""
+import pytest
+from django.test.utils import override_settings
+
+# PBKDF2 тратит на каждый пароль около 0,15 с: столько стоили
+# admin_client и смена пароля в тестах. Стойкость хэша тестам не нужна.
+FAST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    with override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS):
+        yield
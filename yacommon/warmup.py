@@ -0,0 +1,23 @@
+"""Подготовка процесса к первым запросам."""
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны из каталогов DIRS.
+
+    Кэширующий загрузчик оставит их в памяти, и первый запрос не будет
+    читать и разбирать файлы. Возвращает число скомпилированных шаблонов.
+    """
+    if not settings.TEMPLATES_WARM_UP:
+        return 0
+    count = 0
+    for engine in engines.all():
+        for directory in map(Path, engine.dirs):
+            for path in sorted(directory.rglob('*.html')):
+                engine.get_template(path.relative_to(directory).as_posix())
+                count += 1
+    return count